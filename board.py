@@ -0,0 +1,178 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from models import Candidate
+
+QUOTE_FIELDS = ("market", "player", "side", "line", "book", "price", "fair_prob", "weight", "last_update")
+CONSENSUS_FIELDS = ("market", "player", "side", "line", "p", "books")
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+
+def _pick(c: Candidate, stake: float | None = None, **extra) -> dict:
+    d = asdict(c)
+    if stake is not None:
+        d["stake"] = stake
+    d.update(extra)
+    return d
+
+
+class Board:
+    """
+    Read-only, versioned view of what the current run knows: per-event
+    snapshots (quotes, consensus, candidates with tier membership), the tier
+    boards and the blocked counters.
+
+    Every view is kept as ready-to-send JSON bytes with a version. An event is
+    serialized once when its scan lands (and keeps its version if the new
+    snapshot is identical); the shared views are re-serialized lazily, on the
+    first request after they changed. Requests never touch the Odds API or
+    the scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._events = {}   # event_id -> (version, digest, body, summary)
+        self._tiers = {}
+        self._blocked = {}
+        self._changed = {"events": 0, "tiers": 0, "blocked": 0}
+        self._cache = {}    # view -> (version, body)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _bump(self, view: str) -> int:
+        self._version += 1
+        self._changed[view] = self._version
+        return self._version
+
+    def update_event(self, sport: str, event_id: str, event: str, res, tiered: list[tuple[Candidate, list[str]]]) -> None:
+        """Store one event's scan; `tiered` pairs each candidate with the tiers it qualified for."""
+        snap = {
+            "sport": sport,
+            "event_id": event_id,
+            "event": event,
+            "quotes": [dict(zip(QUOTE_FIELDS, q)) for q in res.quotes],
+            "consensus": [dict(zip(CONSENSUS_FIELDS, c)) for c in res.consensus],
+            "candidates": [_pick(c, tiers=tiers) for c, tiers in tiered],
+            "blocked": res.blocked,
+        }
+        body = _dumps(snap)
+        digest = hashlib.sha1(body).digest()
+
+        with self._lock:
+            prev = self._events.get(event_id)
+            if prev is not None and prev[1] == digest:
+                return
+            version = self._bump("events")
+            # the snapshot is serialized once; version/updated are spliced in front
+            body = f'{{"version":{version},"updated":{time.time():.3f},'.encode() + body[1:]
+            summary = {
+                "event_id": event_id, "sport": sport, "event": event, "version": version,
+                "quotes": len(snap["quotes"]), "candidates": len(snap["candidates"]),
+            }
+            self._events[event_id] = (version, digest, body, summary)
+
+    def set_tiers(self, tiers: dict) -> None:
+        """
+        `tiers` maps a tier name to a list of candidates (or (candidate, stake)
+        pairs), or to a parlay dict with "legs".
+        """
+        with self._lock:
+            self._tiers = tiers
+            self._bump("tiers")
+
+    def set_blocked(self, blocked: dict) -> None:
+        with self._lock:
+            if blocked == self._blocked:
+                return
+            self._blocked = dict(blocked)
+            self._bump("blocked")
+
+    def _view(self, name: str, build) -> tuple[int, bytes]:
+        version = self._changed[name]
+        cached = self._cache.get(name)
+        if cached is None or cached[0] != version:
+            cached = (version, _dumps({"version": version, name: build()}))
+            self._cache[name] = cached
+        return cached
+
+    def _tiers_json(self) -> dict:
+        out = {}
+        for name, v in self._tiers.items():
+            if isinstance(v, dict):
+                out[name] = {**{k: x for k, x in v.items() if k != "legs"}, "legs": [_pick(c) for c in v["legs"]]}
+            else:
+                out[name] = [_pick(*c) if isinstance(c, tuple) else _pick(c) for c in v]
+        return out
+
+    def get(self, path: str) -> tuple[int, bytes] | None:
+        """(version, JSON body) for a request path, or None if there is no such view."""
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+        with self._lock:
+            if parts == ["version"]:
+                return self._version, _dumps({"version": self._version})
+            if parts == ["events"]:
+                return self._view("events", lambda: [e[3] for e in self._events.values()])
+            if len(parts) == 2 and parts[0] == "events":
+                e = self._events.get(parts[1])
+                return None if e is None else (e[0], e[2])
+            if parts == ["tiers"]:
+                return self._view("tiers", self._tiers_json)
+            if parts == ["blocked"]:
+                return self._view("blocked", lambda: self._blocked)
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    board: Board = None
+
+    def do_GET(self):
+        found = self.board.get(self.path)
+        if found is None:
+            self._send(404, b'{"error":"not found"}')
+            return
+
+        version, body = found
+        etag = f'"{version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", etag)
+            return
+        self._send(200, body, etag)
+
+    def _send(self, status: int, body: bytes, etag: str | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # polled many times a second; keep the run's output readable
+        pass
+
+
+def serve_board(board: Board, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Serve `board` read-only on a daemon thread:
+    GET /events, /events/<event_id>, /tiers, /blocked, /version. Responses
+    carry an ETag (the view's version), so pollers can send If-None-Match and
+    get an empty 304 until something changed.
+    """
+    handler = type("BoardHandler", (_Handler,), {"board": board})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="board-api", daemon=True).start()
+    return server
@@ -1,90 +1,57 @@
 from __future__ import annotations
 
 import time
-import requests
-from datetime import datetime, timezone, timedelta
-from dateutil import tz, parser
+from datetime import datetime
+
+from config import CONFIG
+
+from delivery import DeliveryQueue
+from export import RunExporter
+from models import Candidate
+from pipeline import ScanJob, run_pipeline
+from pools import TopKPool
+from curves import build_line_curves
+from sizing import size_portfolio
+from scan import normalize_event_index, consensus_prob
+from odds_provider import api_calls, get_events, get_event_odds_multi_book
+from stale import detect_stale_quotes, still_stale
+from timeutil import EASTERN, event_window, filter_events
+from storage import init_db, was_sent_recently, mark_sent
+from probability import expected_value
 
-from config import (
-    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-    SPORTS, EVENTS_PER_SPORT, PREGAME_BUFFER_MINUTES,
-    TARGET_BOOKS, COOLDOWN_MINUTES,
-    MAX_EDGE_CAP, ONE_PICK_PER_GAME,
-    VERIFY_BEFORE_SEND, MAX_VERIFY_EVENTS, MAX_ODDS_MOVE_ABS,
-    LINE_TOLERANCE,
 
-    SHARP_MAX_SINGLES, SHARP_MIN_BOOKS, SHARP_MIN_P, SHARP_MIN_EDGE, SHARP_MIN_EV, SHARP_MIN_ODDS, SHARP_MAX_ODDS,
-    ENABLE_SHARP_BUILDER, BUILDER_LEGS, BUILDER_MIN_DEC, BUILDER_MAX_DEC,
+# ---------- small utils ----------
 
-    ENABLE_LOTTO_3LEG, LOTTO_LEGS, LOTTO_MIN_ODDS, LOTTO_MAX_ODDS, LOTTO_MIN_BOOKS, LOTTO_MIN_EDGE, LOTTO_MIN_EV, LOTTO_MAX_TOTAL_DEC,
+_delivery = None
 
-    ENABLE_PLUS_SHOTS, PLUS_MAX_PICKS, PLUS_MIN_ODDS, PLUS_MAX_ODDS, PLUS_MIN_BOOKS, PLUS_MIN_EDGE, PLUS_MIN_EV,
 
-    ENABLE_HIGHVAR_3LEG, HIGHVAR_LEGS, HIGHVAR_MIN_ODDS, HIGHVAR_MAX_ODDS, HIGHVAR_MIN_TOTAL_DEC, HIGHVAR_MAX_TOTAL_DEC,
-)
+def start_delivery() -> None:
+    global _delivery
+    if not CONFIG.TELEGRAM_BOT_TOKEN or not CONFIG.TELEGRAM_CHAT_IDS:
+        return
+    _delivery = DeliveryQueue(
+        CONFIG.TELEGRAM_BOT_TOKEN, CONFIG.TELEGRAM_CHAT_IDS, CONFIG.TELEGRAM_PER_CHAT_PER_MIN,
+        CONFIG.TELEGRAM_GLOBAL_PER_SEC, CONFIG.OUTBOX_MAX_AGE_MINUTES,
+    )
+    _delivery.start()
 
-from odds_provider import get_events, get_event_odds_multi_book
-from storage import init_db, was_sent_recently, mark_sent
-from probability import (
-    implied_prob_american,
-    expected_value,
-    kelly_fraction,
-    consensus_probability_from_probs,
-    fair_prob_two_way_no_vig,
-)
 
+def finish_delivery() -> None:
+    if _delivery is None:
+        return
+    if not _delivery.flush(CONFIG.DELIVERY_FLUSH_TIMEOUT):
+        print("⚠️ Telegram delivery still pending at exit; left in outbox for next run")
+    _delivery.close()
 
-# ---------- small utils ----------
 
 def send_telegram(msg: str) -> bool:
-    """Returns True if sent; False otherwise."""
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        print("⚠️ Missing TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID")
+    """Queues msg for background delivery. Returns True if queued; False otherwise."""
+    if _delivery is None:
+        print("⚠️ Missing TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID(S)")
         print(msg)
         return False
 
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {"chat_id": TELEGRAM_CHAT_ID, "text": msg, "disable_web_page_preview": True}
-
-    # Retries for network/429/5xx
-    for delay in (0, 2, 5, 10):
-        try:
-            if delay:
-                time.sleep(delay)
-            r = requests.post(url, json=payload, timeout=35)
-
-            if r.status_code in (429,) or (500 <= r.status_code < 600):
-                continue
-
-            r.raise_for_status()
-            return True
-        except Exception as e:
-            last_err = str(e)
-
-    print("⚠️ Telegram send failed:", last_err)
-    print(msg)
-    return False
-
-
-def is_today_et(commence_time: str) -> bool:
-    eastern = tz.gettz("America/New_York")
-    today_et = datetime.now(tz=eastern).date()
-    dt = parser.isoparse(commence_time)
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(eastern).date() == today_et
-
-
-def parse_time_utc(commence_time: str) -> datetime:
-    dt = parser.isoparse(commence_time)
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
-
-
-def is_pregame_ok(commence_time: str) -> bool:
-    dt = parse_time_utc(commence_time)
-    return dt >= datetime.now(timezone.utc) + timedelta(minutes=PREGAME_BUFFER_MINUTES)
+    return _delivery.enqueue(msg) > 0
 
 
 def american_to_decimal(odds: int) -> float:
@@ -93,15 +60,9 @@ def american_to_decimal(odds: int) -> float:
     return 1.0 + (100.0 / abs(odds))
 
 
-def within_tol(a, b, tol: float) -> bool:
-    if a is None or b is None:
-        return False
-    return abs(float(a) - float(b)) <= tol
-
-
 # ---------- markets per sport ----------
 
-SPORTS_NO_NHL = [s for s in SPORTS if s != "icehockey_nhl"]  # enforce removal
+SPORTS_NO_NHL = [s for s in CONFIG.SPORTS if s != "icehockey_nhl"]  # enforce removal
 
 SPORT_MARKETS_PREGAME = {
     "basketball_nba": "player_points,player_threes,player_points_rebounds_assists,spreads,h2h,totals",
@@ -113,108 +74,52 @@ SPORT_MARKETS_PREGAME = {
     "basketball_ncaab": "h2h,spreads,totals",
 }
 
+# alternate-line prop markets; folded into their base market when scanned
+SPORT_MARKETS_ALTERNATE = {
+    "basketball_nba": "player_points_alternate,player_threes_alternate,player_points_rebounds_assists_alternate",
+    "americanfootball_nfl": "player_receptions_alternate,player_reception_yds_alternate,player_pass_yds_alternate",
+    "baseball_mlb": "pitcher_strikeouts_alternate,batter_hits_alternate,batter_total_bases_alternate,batter_home_runs_alternate",
+}
 
-# ---------- odds indexing ----------
-
-def normalize_event_index(odds_data: dict) -> dict:
-    """
-    Index outcomes by (market, participant, side) -> list of dict(book,line,price,fair_prob_in_book?).
-    Adds no-vig fair probs for two-way Over/Under markets when possible.
-    """
-    idx = {}
-    for bm in odds_data.get("bookmakers", []):
-        book = (bm.get("key") or "").lower()
-
-        for m in bm.get("markets", []):
-            market = m.get("key")
-            outcomes = m.get("outcomes", [])
-
-            # capture OU pairs per (participant,line)
-            ou_pairs = {}
-
-            for o in outcomes:
-                participant = o.get("description") or o.get("name")
-                side = o.get("name")
-                line = o.get("point")
-                price = o.get("price")
-
-                if not participant or not market or not side or not isinstance(price, int):
-                    continue
-
-                idx.setdefault((market, participant, side), []).append(
-                    {"book": book, "line": line, "price": price}
-                )
-
-                if side in ("Over", "Under") and line is not None:
-                    ou_pairs.setdefault((participant, float(line)), {})[side] = price
-
-            # compute no-vig fair probabilities for OU pairs in this bookmaker
-            for (participant, line), sides in ou_pairs.items():
-                if "Over" in sides and "Under" in sides:
-                    po = implied_prob_american(sides["Over"])
-                    pu = implied_prob_american(sides["Under"])
-                    fo = fair_prob_two_way_no_vig(po, pu)
-                    for side in ("Over", "Under"):
-                        key = (market, participant, side)
-                        for e in idx.get(key, []):
-                            if e["book"] == book and e.get("line") is not None and float(e["line"]) == float(line):
-                                e["fair_prob_in_book"] = fo if side == "Over" else (1 - fo)
 
-    return idx
+def sport_markets(sport: str) -> str:
+    markets = SPORT_MARKETS_PREGAME.get(sport, "h2h,spreads,totals")
+    if CONFIG.ENABLE_ALT_LINES and sport in SPORT_MARKETS_ALTERNATE:
+        markets += "," + SPORT_MARKETS_ALTERNATE[sport]
+    return markets
 
 
-def consensus_prob(idx: dict, market: str, participant: str, side: str, target_line, tol: float):
-    """
-    Return consensus fair probability (no-vig when available) and count of contributing books.
-    """
-    entries = idx.get((market, participant, side), [])
-    probs = []
-
-    for e in entries:
-        line = e.get("line")
-        if target_line is None:
-            if line is not None:
-                continue
-        else:
-            if line is None or not within_tol(line, target_line, tol):
-                continue
-
-        if "fair_prob_in_book" in e:
-            probs.append(float(e["fair_prob_in_book"]))
-        else:
-            probs.append(implied_prob_american(int(e["price"])))
+# ---------- pick formatting / scoring ----------
 
-    if not probs:
-        return None, 0
+def format_pick(p: Candidate) -> str:
+    odds = f"({p.target_odds:+d})"
+    line = "" if p.line is None else f" {p.line}"
+    return f"{p.player} — {p.market} — {p.side}{line} {odds}"
 
-    return consensus_probability_from_probs(probs), len(probs)
 
+def pick_key(p: Candidate) -> str:
+    return f"{p.event}|{p.market}|{p.player}|{p.side}|{p.line}|{p.target_book_used}|{p.target_odds}"
 
-# ---------- pick formatting / scoring ----------
 
-def format_pick(p: dict) -> str:
-    odds = f"({p['target_odds']:+d})"
-    line = "" if p.get("line") is None else f" {p['line']}"
-    return f"{p['player']} — {p['market']} — {p['side']}{line} {odds}"
+def stake_text(stake: float) -> str:
+    if stake < 0.00005:
+        return "Stake: pass (better covered by the other picks)"
+    return f"Stake≈{stake*100:.2f}% bankroll"
 
 
-def why_line(p: dict) -> str:
-    imp = implied_prob_american(p["target_odds"])
-    edge = p["p_model"] - imp
+def why_line(p: Candidate) -> str:
     return (
-        f"WHY: p_fair={p['p_model']:.3f} vs implied={imp:.3f} "
-        f"(edge={edge:+.3f}), EV=${p['ev']:.3f}/$1, books={p['books_count']}, Kelly~{p['kelly_frac']*100:.2f}%"
+        f"WHY: p_fair={p.p_model:.3f} vs implied={p.implied:.3f} "
+        f"(edge={p.edge:+.3f}), EV=${p.ev:.3f}/$1, books={p.books_count}"
     )
 
 
-def pick_score(p: dict) -> float:
-    imp = implied_prob_american(p["target_odds"])
-    edge = p["p_model"] - imp
-    # a stable “quality” score (not a guarantee)
-    return (p["ev"] * 100.0) + (edge * 60.0) + (min(p["books_count"], 10) * 0.5)
+def pick_score(p: Candidate) -> float:
+    # computed once when the Candidate is built
+    return p.score
 
 
-def grade_pick(p: dict) -> float:
+def grade_pick(p: Candidate) -> float:
     """
     Mimic your friend's "grade" style (9.0+ etc).
     This is just a rescaled quality score based on EV/edge/books.
@@ -229,20 +134,8 @@ def grade_pick(p: dict) -> float:
     return g
 
 
-def select_top_unique_game(picks: list[dict], n: int) -> list[dict]:
-    out = []
-    seen = set()
-    for p in sorted(picks, key=pick_score, reverse=True):
-        if ONE_PICK_PER_GAME and p["event"] in seen:
-            continue
-        seen.add(p["event"])
-        out.append(p)
-        if len(out) >= n:
-            break
-    return out
-
-
-def build_parlay(picks: list[dict], legs: int, min_total_dec: float, max_total_dec: float):
+def build_parlay(picks: list[Candidate], legs: int, min_total_dec: float, max_total_dec: float):
+    """Greedy parlay from `picks`, which must already be ranked best-first."""
     if len(picks) < legs:
         return None
 
@@ -250,12 +143,12 @@ def build_parlay(picks: list[dict], legs: int, min_total_dec: float, max_total_d
     used_events = set()
     total_dec = 1.0
 
-    for p in sorted(picks, key=pick_score, reverse=True):
-        if ONE_PICK_PER_GAME and p["event"] in used_events:
+    for p in picks:
+        if CONFIG.ONE_PICK_PER_GAME and p.event in used_events:
             continue
-        used_events.add(p["event"])
+        used_events.add(p.event)
         chosen.append(p)
-        total_dec *= american_to_decimal(int(p["target_odds"]))
+        total_dec *= american_to_decimal(p.target_odds)
         if len(chosen) == legs:
             break
 
@@ -270,53 +163,57 @@ def build_parlay(picks: list[dict], legs: int, min_total_dec: float, max_total_d
 
 # ---------- verification refresh ----------
 
-def verify_refresh(picks: list[dict], blocked: dict) -> list[dict]:
-    if not picks or not VERIFY_BEFORE_SEND:
+def verify_refresh(picks: list[Candidate], blocked: dict) -> list[Candidate]:
+    """Re-price picks against fresh odds; survivors come back as new records in input (rank) order."""
+    if not picks or not CONFIG.VERIFY_BEFORE_SEND:
         return picks
 
     groups = {}
     for p in picks:
-        groups.setdefault((p["sport"], p["event_id"]), []).append(p)
+        groups.setdefault((p.sport, p.event_id), []).append(p)
 
-    verified = []
+    verified = {}
     calls = 0
 
     for (sport, event_id), plist in groups.items():
-        if calls >= MAX_VERIFY_EVENTS:
-            verified += plist
+        if calls >= CONFIG.MAX_VERIFY_EVENTS:
+            verified.update((id(p), p) for p in plist)
             continue
 
-        markets = SPORT_MARKETS_PREGAME.get(sport, "h2h,spreads,totals")
+        markets = sport_markets(sport)
         try:
-            odds = get_event_odds_multi_book(sport, event_id, markets)
+            odds = get_event_odds_multi_book(sport, event_id, markets, priority="verify")
             calls += 1
         except Exception:
             blocked["api_fail"] += 1
-            verified += plist
+            verified.update((id(p), p) for p in plist)
             continue
 
         idx = normalize_event_index(odds)
+        curves = None
+        if CONFIG.ENABLE_LINE_CURVES:
+            curves = build_line_curves(idx, {(p.market, p.player) for p in plist})
 
         for p in plist:
             best = None
 
-            for e in idx.get((p["market"], p["player"], p["side"]), []):
-                if e["book"] not in TARGET_BOOKS:
+            for e in idx.get((p.market, p.player, p.side), []):
+                if e["book"] not in CONFIG.TARGET_BOOKS:
                     continue
 
                 # exact line match if line present
-                if p.get("line") is None:
+                if p.line is None:
                     if e.get("line") is not None:
                         continue
                 else:
-                    if e.get("line") is None or float(e["line"]) != float(p["line"]):
+                    if e.get("line") is None or float(e["line"]) != p.line:
                         continue
 
                 odds_val = int(e["price"])
-                if odds_val < p["min_odds"] or odds_val > p["max_odds"]:
+                if odds_val < p.min_odds or odds_val > p.max_odds:
                     continue
 
-                p_model, books_count = consensus_prob(idx, p["market"], p["player"], p["side"], p.get("line"), LINE_TOLERANCE)
+                p_model, books_count = consensus_prob(idx, p.market, p.player, p.side, p.line, CONFIG.LINE_TOLERANCE, curves)
                 if p_model is None:
                     continue
 
@@ -330,215 +227,281 @@ def verify_refresh(picks: list[dict], blocked: dict) -> list[dict]:
 
             ev_val, book, odds_val, p_model, books_count = best
 
-            if abs(int(odds_val) - int(p["target_odds"])) > MAX_ODDS_MOVE_ABS:
+            if abs(int(odds_val) - p.target_odds) > CONFIG.MAX_ODDS_MOVE_ABS:
                 blocked["moved"] += 1
                 continue
 
-            p["target_book_used"] = book
-            p["target_odds"] = int(odds_val)
-            p["p_model"] = float(p_model)
-            p["books_count"] = int(books_count)
-            p["ev"] = float(ev_val)
-            p["kelly_frac"] = min(kelly_fraction(p["p_model"], p["target_odds"]), 0.01)
+            verified[id(p)] = p.with_quote(book, odds_val, p_model, books_count, ev_val)
 
-            verified.append(p)
+    return [verified[id(p)] for p in picks if id(p) in verified]
 
-    return verified
+
+def verify_parlay(parlay: dict | None, legs: int, blocked: dict) -> dict | None:
+    """Re-price a parlay's legs; it is dropped unless every leg survives."""
+    if not parlay:
+        return None
+    verified = verify_refresh(parlay["legs"], blocked)
+    if len(verified) < legs:
+        return None
+    dec = 1.0
+    for leg in verified:
+        dec *= american_to_decimal(leg.target_odds)
+    return {**parlay, "legs": verified, "dec": dec}
+
+
+# ---------- stale quote fast path ----------
+
+def stale_fast_path(sport: str, event_id: str, event_name: str, markets: str, stale: list[dict], blocked: dict) -> int:
+    """
+    Alert immediately on target-book quotes lagging the market (as found by the
+    scan), without waiting for the end-of-run message. Optionally re-fetches the
+    event first so only quotes that are still up get sent. Returns number of quotes alerted.
+    """
+    if CONFIG.STALE_REFETCH:
+        try:
+            fresh_idx = normalize_event_index(get_event_odds_multi_book(sport, event_id, markets, priority="verify"))
+        except Exception:
+            blocked["api_fail"] += 1
+            return 0
+        fresh = detect_stale_quotes(
+            fresh_idx, CONFIG.TARGET_BOOKS, CONFIG.STALE_MIN_DELTA, CONFIG.STALE_MIN_LAG_SECONDS, CONFIG.STALE_MIN_BOOKS,
+            CONFIG.LINE_TOLERANCE if CONFIG.ENABLE_LINE_CURVES else None,
+        )
+        stale = [s for s in stale if still_stale(fresh, s)]
+
+    lines = ["⚡ STALE LINE — act fast", event_name, ""]
+    sent = 0
+    for s in stale:
+        key = f"stale|{event_name}|{s['market']}|{s['player']}|{s['side']}|{s['line']}|{s['book']}|{s['odds']}"
+        if was_sent_recently(key, CONFIG.COOLDOWN_MINUTES):
+            continue
+        mark_sent(key)
+
+        line = "" if s["line"] is None else f" {s['line']}"
+        lines.extend([
+            f"• {s['player']} — {s['market']} — {s['side']}{line} ({s['odds']:+d})",
+            f"  Book={s['book']} lagging {s['lag_seconds'] / 60:.0f}m",
+            f"  p_mkt={s['p_consensus']:.3f} (Δ={s['delta']:+.3f}), EV=${s['ev']:.3f}/$1, books={s['books_count']}",
+            "",
+        ])
+        sent += 1
+
+    if sent:
+        send_telegram("\n".join(lines))
+    return sent
 
 
 # ---------- output helper (NO NESTED SCOPING BUG) ----------
 
-def emit_section(lines: list[str], title: str, stake_line: str, picks: list[dict], any_sent: bool) -> bool:
+def emit_section(lines: list[str], title: str, picks: list[Candidate], stakes: dict, any_sent: bool,
+                 sent: list | None = None) -> bool:
+    """Append a singles section; picks still in cooldown are skipped, the rest are collected in `sent`."""
     if not picks:
         return any_sent
 
     lines.append(title)
-    lines.append(stake_line)
     lines.append("")
 
     for p in picks:
-        key = f"{p['event']}|{p['market']}|{p['player']}|{p['side']}|{p.get('line')}|{p['target_book_used']}|{p['target_odds']}"
-        if was_sent_recently(key, COOLDOWN_MINUTES):
+        key = pick_key(p)
+        if was_sent_recently(key, CONFIG.COOLDOWN_MINUTES):
             continue
 
         mark_sent(key)
 
         lines.extend([
             f"• {format_pick(p)}",
-            f"  {p['event']}",
-            f"  Book={p['target_book_used']}",
+            f"  {p.event}",
+            f"  Book={p.target_book_used} | {stake_text(stakes[key])}",
             f"  {why_line(p)}",
             "",
         ])
         any_sent = True
+        if sent is not None:
+            sent.append(p)
 
     return any_sent
 
 
 def main() -> None:
     init_db()
+    start_delivery()
+    window = event_window(CONFIG.PREGAME_BUFFER_MINUTES)
 
     blocked = {"window": 0, "books": 0, "tier": 0, "api_fail": 0, "moved": 0}
-    event_calls = 0
-    odds_calls = 0
+    stale_alerts = 0
     today_used = 0
 
-    sharp_pool = []
-    lotto_pool = []
-    plus_pool = []
-    highvar_pool = []
+    # bounded per-tier pools; one-pick-per-game is applied as candidates stream in
+    sharp_pool = TopKPool(CONFIG.SHARP_MAX_SINGLES, CONFIG.ONE_PICK_PER_GAME)
+    lotto_pool = TopKPool(14, CONFIG.ONE_PICK_PER_GAME)
+    plus_pool = TopKPool(CONFIG.PLUS_MAX_PICKS, CONFIG.ONE_PICK_PER_GAME)
+    highvar_pool = TopKPool(20, CONFIG.ONE_PICK_PER_GAME)
 
+    exporter = None
+    if CONFIG.EXPORT_DIR:
+        exporter = RunExporter(
+            CONFIG.EXPORT_DIR, CONFIG.EXPORT_FORMAT, int(time.time()), datetime.now(tz=EASTERN).date().isoformat()
+        )
+
+    board = server = None
+    if CONFIG.BOARD_API_PORT:
+        from board import Board, serve_board  # lazy: http.server only loads when the API is on
+
+        board = Board()
+        server = serve_board(board, CONFIG.BOARD_API_HOST, CONFIG.BOARD_API_PORT)
+        print(f"Board API on http://{CONFIG.BOARD_API_HOST}:{CONFIG.BOARD_API_PORT}")
+
+    jobs = []
     for sport in SPORTS_NO_NHL:
         try:
             events = get_events(sport)
-            event_calls += 1
         except Exception:
             blocked["api_fail"] += 1
             continue
 
-        today_events = [e for e in events if e.get("commence_time") and is_today_et(e["commence_time"])]
-        pre = [e for e in today_events if is_pregame_ok(e["commence_time"])]
-        today_used += min(len(pre), EVENTS_PER_SPORT)
+        pre = filter_events(events, window)
+        today_used += min(len(pre), CONFIG.EVENTS_PER_SPORT)
 
-        markets = SPORT_MARKETS_PREGAME.get(sport, "h2h,spreads,totals")
-
-        for ev in pre[:EVENTS_PER_SPORT]:
-            try:
-                odds = get_event_odds_multi_book(sport, ev["id"], markets)
-                odds_calls += 1
-            except Exception:
-                blocked["api_fail"] += 1
-                continue
+        markets = sport_markets(sport)
 
-            idx = normalize_event_index(odds)
+        for ev in pre[:CONFIG.EVENTS_PER_SPORT]:
             event_name = f"{ev.get('away_team','')} @ {ev.get('home_team','')}".strip(" @")
+            jobs.append(ScanJob(sport, ev["id"], event_name, markets))
 
-            # evaluate each (market, player, side) and find best target book among TARGET_BOOKS
-            for (market, participant, side), entries in idx.items():
-                best_exec = None
-
-                for e in entries:
-                    if e["book"] not in TARGET_BOOKS:
-                        continue
-
-                    odds_val = int(e["price"])
-                    line = e.get("line")
-
-                    p_model, books_count = consensus_prob(idx, market, participant, side, line, LINE_TOLERANCE)
-                    if p_model is None:
-                        continue
-
-                    ev_val = expected_value(p_model, odds_val)
-
-                    if best_exec is None or ev_val > best_exec[0]:
-                        best_exec = (ev_val, e["book"], odds_val, line, p_model, books_count)
-
-                if not best_exec:
-                    continue
-
-                ev_val, book, odds_val, line, p_model, books_count = best_exec
-                imp = implied_prob_american(odds_val)
-                edge = p_model - imp
-
-                # sanity cap to avoid “too good to be true”
-                if edge > MAX_EDGE_CAP:
-                    blocked["tier"] += 1
-                    continue
-
-                # require line for Over/Under outcomes
-                if side in ("Over", "Under") and line is None:
-                    continue
+    # fetch + score run in the pipeline; this loop is the single aggregator doing tiering
+    for job, res in run_pipeline(jobs, CONFIG.PIPELINE_FETCH_WORKERS, CONFIG.PIPELINE_CPU_WORKERS, CONFIG.PIPELINE_MAX_INFLIGHT):
+        if res is None:
+            blocked["api_fail"] += 1
+            continue
 
-                cand = {
-                    "sport": sport,
-                    "event_id": ev["id"],
-                    "event": event_name,
-                    "market": market,
-                    "player": participant,
-                    "side": side,
-                    "line": None if line is None else float(line),
-                    "p_model": float(p_model),
-                    "books_count": int(books_count),
-                    "target_book_used": book,
-                    "target_odds": int(odds_val),
-                    "ev": float(ev_val),
-                    "kelly_frac": min(kelly_fraction(p_model, odds_val), 0.01),
-                }
-
-                # SHARP
-                if (SHARP_MIN_ODDS <= odds_val <= SHARP_MAX_ODDS
-                    and books_count >= SHARP_MIN_BOOKS
-                    and cand["p_model"] >= SHARP_MIN_P
-                    and edge >= SHARP_MIN_EDGE
-                    and cand["ev"] >= SHARP_MIN_EV):
-                    s = dict(cand)
-                    s["min_odds"] = SHARP_MIN_ODDS
-                    s["max_odds"] = SHARP_MAX_ODDS
-                    sharp_pool.append(s)
-
-                # LOTTO
-                if ENABLE_LOTTO_3LEG:
-                    if (LOTTO_MIN_ODDS <= odds_val <= LOTTO_MAX_ODDS
-                        and books_count >= LOTTO_MIN_BOOKS
-                        and edge >= LOTTO_MIN_EDGE
-                        and cand["ev"] >= LOTTO_MIN_EV):
-                        l = dict(cand)
-                        l["min_odds"] = LOTTO_MIN_ODDS
-                        l["max_odds"] = LOTTO_MAX_ODDS
-                        lotto_pool.append(l)
-
-                # PLUS-MONEY
-                if ENABLE_PLUS_SHOTS:
-                    if (PLUS_MIN_ODDS <= odds_val <= PLUS_MAX_ODDS
-                        and books_count >= PLUS_MIN_BOOKS
-                        and edge >= PLUS_MIN_EDGE
-                        and cand["ev"] >= PLUS_MIN_EV):
-                        p = dict(cand)
-                        p["min_odds"] = PLUS_MIN_ODDS
-                        p["max_odds"] = PLUS_MAX_ODDS
-                        plus_pool.append(p)
-
-                # HIGH VAR candidates
-                if ENABLE_HIGHVAR_3LEG:
-                    if (HIGHVAR_MIN_ODDS <= odds_val <= HIGHVAR_MAX_ODDS
-                        and books_count >= max(4, PLUS_MIN_BOOKS)
-                        and edge >= max(0.016, PLUS_MIN_EDGE)
-                        and cand["ev"] >= max(0.012, PLUS_MIN_EV)):
-                        hv = dict(cand)
-                        hv["min_odds"] = HIGHVAR_MIN_ODDS
-                        hv["max_odds"] = HIGHVAR_MAX_ODDS
-                        highvar_pool.append(hv)
+        for reason, n in res.blocked.items():
+            blocked[reason] = blocked.get(reason, 0) + n
+
+        if exporter:
+            exporter.add_quotes(job.sport, job.event_id, res.quotes)
+
+        if res.stale:
+            stale_alerts += stale_fast_path(job.sport, job.event_id, job.event, job.markets, res.stale, blocked)
+
+        tiered = []
+        for row in res.rows:
+            cand = Candidate(job.sport, job.event_id, job.event, *row)
+            odds_val = cand.target_odds
+            books_count = cand.books_count
+            edge = cand.edge
+            score = cand.score
+
+            # SHARP
+            in_sharp = (CONFIG.SHARP_MIN_ODDS <= odds_val <= CONFIG.SHARP_MAX_ODDS
+                        and books_count >= CONFIG.SHARP_MIN_BOOKS
+                        and cand.p_model >= CONFIG.SHARP_MIN_P
+                        and edge >= CONFIG.SHARP_MIN_EDGE
+                        and cand.ev >= CONFIG.SHARP_MIN_EV)
+            if in_sharp:
+                s = cand.for_tier(CONFIG.SHARP_MIN_ODDS, CONFIG.SHARP_MAX_ODDS)
+                sharp_pool.push(s, score)
+
+            # LOTTO
+            in_lotto = (CONFIG.ENABLE_LOTTO_3LEG
+                        and CONFIG.LOTTO_MIN_ODDS <= odds_val <= CONFIG.LOTTO_MAX_ODDS
+                        and books_count >= CONFIG.LOTTO_MIN_BOOKS
+                        and edge >= CONFIG.LOTTO_MIN_EDGE
+                        and cand.ev >= CONFIG.LOTTO_MIN_EV)
+            if in_lotto:
+                l = cand.for_tier(CONFIG.LOTTO_MIN_ODDS, CONFIG.LOTTO_MAX_ODDS)
+                lotto_pool.push(l, score)
+
+            # PLUS-MONEY
+            in_plus = (CONFIG.ENABLE_PLUS_SHOTS
+                       and CONFIG.PLUS_MIN_ODDS <= odds_val <= CONFIG.PLUS_MAX_ODDS
+                       and books_count >= CONFIG.PLUS_MIN_BOOKS
+                       and edge >= CONFIG.PLUS_MIN_EDGE
+                       and cand.ev >= CONFIG.PLUS_MIN_EV)
+            if in_plus:
+                p = cand.for_tier(CONFIG.PLUS_MIN_ODDS, CONFIG.PLUS_MAX_ODDS)
+                plus_pool.push(p, score)
+
+            # HIGH VAR candidates
+            in_highvar = (CONFIG.ENABLE_HIGHVAR_3LEG
+                          and CONFIG.HIGHVAR_MIN_ODDS <= odds_val <= CONFIG.HIGHVAR_MAX_ODDS
+                          and books_count >= max(4, CONFIG.PLUS_MIN_BOOKS)
+                          and edge >= max(0.016, CONFIG.PLUS_MIN_EDGE)
+                          and cand.ev >= max(0.012, CONFIG.PLUS_MIN_EV))
+            if in_highvar:
+                hv = cand.for_tier(CONFIG.HIGHVAR_MIN_ODDS, CONFIG.HIGHVAR_MAX_ODDS)
+                highvar_pool.push(hv, score)
+
+            if exporter:
+                exporter.add_candidate(cand, in_sharp, in_lotto, in_plus, in_highvar)
+            if board:
+                tiered.append((cand, [name for name, ok in (
+                    ("sharp", in_sharp), ("lotto", in_lotto), ("plus", in_plus), ("highvar", in_highvar)
+                ) if ok]))
+
+        if board:
+            board.update_event(job.sport, job.event_id, job.event, res, tiered)
+            board.set_blocked(blocked)
+            board.set_tiers({
+                "sharp": sharp_pool.ranked(), "lotto": lotto_pool.ranked(),
+                "plus": plus_pool.ranked(), "highvar": highvar_pool.ranked(),
+            })
 
     # Select & verify
-    sharp = verify_refresh(select_top_unique_game(sharp_pool, SHARP_MAX_SINGLES), blocked)
+    sharp = verify_refresh(sharp_pool.ranked(), blocked)
 
     plus = []
-    if ENABLE_PLUS_SHOTS:
-        plus = verify_refresh(select_top_unique_game(plus_pool, PLUS_MAX_PICKS), blocked)
+    if CONFIG.ENABLE_PLUS_SHOTS:
+        plus = verify_refresh(plus_pool.ranked(), blocked)
 
     sharp_builder = None
-    if ENABLE_SHARP_BUILDER and len(sharp) >= BUILDER_LEGS:
-        sharp_builder = build_parlay(sharp, BUILDER_LEGS, BUILDER_MIN_DEC, BUILDER_MAX_DEC)
+    if CONFIG.ENABLE_SHARP_BUILDER and len(sharp) >= CONFIG.BUILDER_LEGS:
+        sharp_builder = build_parlay(sharp, CONFIG.BUILDER_LEGS, CONFIG.BUILDER_MIN_DEC, CONFIG.BUILDER_MAX_DEC)
 
     lotto = None
-    if ENABLE_LOTTO_3LEG:
-        lotto = build_parlay(select_top_unique_game(lotto_pool, 14), LOTTO_LEGS, 1.01, LOTTO_MAX_TOTAL_DEC)
-        if lotto:
-            lotto["legs"] = verify_refresh(lotto["legs"], blocked)
+    if CONFIG.ENABLE_LOTTO_3LEG:
+        lotto = build_parlay(lotto_pool.ranked(), CONFIG.LOTTO_LEGS, 1.01, CONFIG.LOTTO_MAX_TOTAL_DEC)
+        lotto = verify_parlay(lotto, CONFIG.LOTTO_LEGS, blocked)
 
     highvar = None
-    if ENABLE_HIGHVAR_3LEG:
-        highvar = build_parlay(select_top_unique_game(highvar_pool, 20), HIGHVAR_LEGS, HIGHVAR_MIN_TOTAL_DEC, HIGHVAR_MAX_TOTAL_DEC)
-        if highvar:
-            highvar["legs"] = verify_refresh(highvar["legs"], blocked)
+    if CONFIG.ENABLE_HIGHVAR_3LEG:
+        highvar = build_parlay(highvar_pool.ranked(), CONFIG.HIGHVAR_LEGS, CONFIG.HIGHVAR_MIN_TOTAL_DEC, CONFIG.HIGHVAR_MAX_TOTAL_DEC)
+        highvar = verify_parlay(highvar, CONFIG.HIGHVAR_LEGS, blocked)
+
+    # Stakes: one simultaneous-Kelly solve over every single and parlay in this run
+    singles = list({pick_key(p): p for p in sharp + plus}.values())
+    parlays = [pk for pk in (sharp_builder, highvar, lotto) if pk]
+    fracs = size_portfolio(
+        [[p] for p in singles] + [pk["legs"] for pk in parlays],
+        CONFIG.KELLY_MULTIPLIER, CONFIG.KELLY_BANKROLL_CAP, CONFIG.KELLY_MAX_BET,
+        CONFIG.KELLY_EXACT_MAX_BETS,
+    )
+    stakes = {pick_key(p): f for p, f in zip(singles, fracs)}
+    for pk, f in zip(parlays, fracs[len(singles):]):
+        pk["stake"] = f
+
+    if board:
+        # verified picks with their stakes replace the live scan pools
+        board.set_blocked(blocked)
+        board.set_tiers({
+            name: v for name, v in (
+                ("sharp", [(p, stakes[pick_key(p)]) for p in sharp]),
+                ("plus", [(p, stakes[pick_key(p)]) for p in plus]),
+                ("sharp_builder", sharp_builder), ("highvar", highvar), ("lotto", lotto),
+            ) if v
+        })
 
     # Message header
-    eastern = tz.gettz("America/New_York")
-    now = datetime.now(tz=eastern).strftime("%a %b %d %I:%M %p ET")
+    now = datetime.now(tz=EASTERN).strftime("%a %b %d %I:%M %p ET")
 
     lines = []
     lines.append("✅ SHARP MODE — Today Only")
     lines.append(now)
+    if fracs:
+        lines.append(
+            f"Stakes: {CONFIG.KELLY_MULTIPLIER:g}× Kelly sized jointly across all picks, "
+            f"total {sum(fracs)*100:.2f}% bankroll (cap {CONFIG.KELLY_BANKROLL_CAP*100:g}%)"
+        )
     lines.append("")
 
     any_sent = False
@@ -554,24 +517,26 @@ def main() -> None:
             g = grade_pick(p)
             lines.extend([
                 f"{i}. {format_pick(p)} — Grade: {g:.1f}",
-                f"   {p['event']} | Book={p['target_book_used']}",
+                f"   {p.event} | Book={p.target_book_used} | {stake_text(stakes[pick_key(p)])}",
                 f"   {why_line(p)}",
                 "",
             ])
         any_sent = True
 
     # Regular sections
+    sharp_sent = []
     any_sent = emit_section(
         lines,
         "🟢 SHARP SINGLES",
-        "Stake guide: ~0.75–1.0% bankroll each",
         sharp,
-        any_sent
+        stakes,
+        any_sent,
+        sharp_sent,
     )
 
     if sharp_builder:
         lines.append("🟣 SHARP PARLAY BUILDER (from SHARP singles only)")
-        lines.append("Stake guide: 0.10–0.25% bankroll (small)")
+        lines.append(stake_text(sharp_builder["stake"]))
         lines.append("")
         lines.append(f"Total decimal ≈ {sharp_builder['dec']:.2f}")
         for leg in sharp_builder["legs"]:
@@ -579,17 +544,19 @@ def main() -> None:
         lines.append("")
         any_sent = True
 
+    plus_sent = []
     any_sent = emit_section(
         lines,
         "🟠 PLUS-MONEY SHOTS (bigger win, higher variance)",
-        "Stake guide: 0.25–0.50% bankroll (smaller)",
         plus,
-        any_sent
+        stakes,
+        any_sent,
+        plus_sent,
     )
 
     if highvar:
         lines.append("🔥 HIGH-VARIANCE 3-LEG (bigger payout)")
-        lines.append("Stake guide: 0.05–0.15% bankroll (tiny)")
+        lines.append(stake_text(highvar["stake"]))
         lines.append("")
         lines.append(f"Total decimal ≈ {highvar['dec']:.2f}")
         for leg in highvar["legs"]:
@@ -599,12 +566,9 @@ def main() -> None:
 
     if lotto:
         lines.append("🎲 LOTTO 3-LEG (optional fun)")
-        lines.append("Stake guide: 0.05–0.10% bankroll (tiny)")
+        lines.append(stake_text(lotto["stake"]))
         lines.append("")
-        dec = 1.0
-        for leg in lotto["legs"]:
-            dec *= american_to_decimal(int(leg["target_odds"]))
-        lines.append(f"Total decimal ≈ {dec:.2f}")
+        lines.append(f"Total decimal ≈ {lotto['dec']:.2f}")
         for leg in lotto["legs"]:
             lines.append(f"- {format_pick(leg)}")
         lines.append("")
@@ -614,11 +578,37 @@ def main() -> None:
         lines.append("No qualified picks right now. Best move is no bet.")
         lines.append("")
 
-    lines.append(f"API calls: events={event_calls}, event-odds={odds_calls} (today events used={today_used})")
+    calls = api_calls()
+    lines.append(f"API calls: events={calls['events']}, event-odds={calls['event-odds']} (today events used={today_used})")
+    if CONFIG.ENABLE_STALE_ALERTS:
+        lines.append(f"Stale-line alerts sent: {stale_alerts}")
     lines.append(f"Blocked: tier={blocked['tier']}, api_fail={blocked['api_fail']}, moved={blocked['moved']}")
+    gated = {k: n for k, n in blocked.items() if k not in ("window", "books", "tier", "api_fail", "moved") and n}
+    if gated or blocked["window"]:
+        gated["window"] = blocked["window"]
+        lines.append("Gated: " + ", ".join(f"{k}={n}" for k, n in sorted(gated.items())))
     lines.append("🔎 Not guarantees — higher payout = higher variance. Keep plus/parlay stakes small.")
 
+    if exporter:
+        # only what this message actually carries, with the stakes it shows
+        exporter.add_picks("sharp", sharp_sent, [stakes[pick_key(p)] for p in sharp_sent])
+        exporter.add_picks("plus", plus_sent, [stakes[pick_key(p)] for p in plus_sent])
+        for section, pk in (("sharp_builder", sharp_builder), ("highvar", highvar), ("lotto", lotto)):
+            if pk:
+                exporter.add_picks(section, pk["legs"], [pk["stake"]] * len(pk["legs"]))
+        try:
+            exporter.write()
+        except Exception as e:
+            print("⚠️ Export failed:", str(e))
+
     send_telegram("\n".join(lines))
+    finish_delivery()
+
+    if server:
+        if CONFIG.BOARD_API_LINGER_SECONDS > 0:
+            print(f"Board API serving for another {CONFIG.BOARD_API_LINGER_SECONDS:g}s")
+            time.sleep(CONFIG.BOARD_API_LINGER_SECONDS)
+        server.shutdown()
 
 
 if __name__ == "__main__":
@@ -1,72 +1,375 @@
 import os
+from dataclasses import dataclass
 
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
-ODDS_API_KEY = os.getenv("ODDS_API_KEY")
-REGION = os.getenv("REGION", "us")
-
-TARGET_BOOKS = [x.strip().lower() for x in os.getenv(
-    "TARGET_BOOKS", "draftkings,fanduel,betmgm,fanatics"
-).split(",") if x.strip()]
-
-# ✅ NHL REMOVED
-SPORTS = [x.strip() for x in os.getenv(
-    "SPORTS",
-    "americanfootball_nfl,basketball_nba,baseball_mlb,"
-    "soccer_epl,soccer_usa_mls,americanfootball_ncaaf,basketball_ncaab"
-).split(",") if x.strip()]
-
-EVENTS_PER_SPORT = int(os.getenv("EVENTS_PER_SPORT", "6"))
-PREGAME_BUFFER_MINUTES = int(os.getenv("PREGAME_BUFFER_MINUTES", "15"))
-COOLDOWN_MINUTES = int(os.getenv("COOLDOWN_MINUTES", "90"))
-
-MAX_EDGE_CAP = float(os.getenv("MAX_EDGE_CAP", "0.08"))
-ONE_PICK_PER_GAME = os.getenv("ONE_PICK_PER_GAME", "true").lower() == "true"
-
-VERIFY_BEFORE_SEND = os.getenv("VERIFY_BEFORE_SEND", "true").lower() == "true"
-MAX_VERIFY_EVENTS = int(os.getenv("MAX_VERIFY_EVENTS", "4"))
-MAX_ODDS_MOVE_ABS = int(os.getenv("MAX_ODDS_MOVE_ABS", "25"))
-
-LINE_TOLERANCE = float(os.getenv("LINE_TOLERANCE", "1.0"))
-
-# --- SHARP singles ---
-SHARP_MAX_SINGLES = int(os.getenv("SHARP_MAX_SINGLES", "2"))
-SHARP_MIN_BOOKS = int(os.getenv("SHARP_MIN_BOOKS", "4"))
-SHARP_MIN_P = float(os.getenv("SHARP_MIN_P", "0.53"))
-SHARP_MIN_EDGE = float(os.getenv("SHARP_MIN_EDGE", "0.014"))
-SHARP_MIN_EV = float(os.getenv("SHARP_MIN_EV", "0.012"))
-SHARP_MIN_ODDS = int(os.getenv("SHARP_MIN_ODDS", "-220"))
-SHARP_MAX_ODDS = int(os.getenv("SHARP_MAX_ODDS", "175"))
-
-# --- SHARP builder ---
-ENABLE_SHARP_BUILDER = os.getenv("ENABLE_SHARP_BUILDER", "true").lower() == "true"
-BUILDER_LEGS = int(os.getenv("BUILDER_LEGS", "3"))
-BUILDER_MIN_DEC = float(os.getenv("BUILDER_MIN_DEC", "3.0"))
-BUILDER_MAX_DEC = float(os.getenv("BUILDER_MAX_DEC", "7.0"))
-
-# --- LOTTO 3-leg ---
-ENABLE_LOTTO_3LEG = os.getenv("ENABLE_LOTTO_3LEG", "true").lower() == "true"
-LOTTO_LEGS = int(os.getenv("LOTTO_LEGS", "3"))
-LOTTO_MIN_ODDS = int(os.getenv("LOTTO_MIN_ODDS", "110"))
-LOTTO_MAX_ODDS = int(os.getenv("LOTTO_MAX_ODDS", "350"))
-LOTTO_MIN_BOOKS = int(os.getenv("LOTTO_MIN_BOOKS", "4"))
-LOTTO_MIN_EDGE = float(os.getenv("LOTTO_MIN_EDGE", "0.018"))
-LOTTO_MIN_EV = float(os.getenv("LOTTO_MIN_EV", "0.015"))
-LOTTO_MAX_TOTAL_DEC = float(os.getenv("LOTTO_MAX_TOTAL_DEC", "18.0"))
-
-# --- PLUS-MONEY bigger wins ---
-ENABLE_PLUS_SHOTS = os.getenv("ENABLE_PLUS_SHOTS", "true").lower() == "true"
-PLUS_MAX_PICKS = int(os.getenv("PLUS_MAX_PICKS", "1"))
-PLUS_MIN_ODDS = int(os.getenv("PLUS_MIN_ODDS", "160"))
-PLUS_MAX_ODDS = int(os.getenv("PLUS_MAX_ODDS", "320"))
-PLUS_MIN_BOOKS = int(os.getenv("PLUS_MIN_BOOKS", "5"))
-PLUS_MIN_EDGE = float(os.getenv("PLUS_MIN_EDGE", "0.020"))
-PLUS_MIN_EV = float(os.getenv("PLUS_MIN_EV", "0.015"))
-
-# --- High-variance parlay (bigger payout) ---
-ENABLE_HIGHVAR_3LEG = os.getenv("ENABLE_HIGHVAR_3LEG", "true").lower() == "true"
-HIGHVAR_LEGS = int(os.getenv("HIGHVAR_LEGS", "3"))
-HIGHVAR_MIN_ODDS = int(os.getenv("HIGHVAR_MIN_ODDS", "140"))
-HIGHVAR_MAX_ODDS = int(os.getenv("HIGHVAR_MAX_ODDS", "350"))
-HIGHVAR_MIN_TOTAL_DEC = float(os.getenv("HIGHVAR_MIN_TOTAL_DEC", "6.0"))
-HIGHVAR_MAX_TOTAL_DEC = float(os.getenv("HIGHVAR_MAX_TOTAL_DEC", "20.0"))
+
+# ---------- env parsing ----------
+
+def _str(env, name: str, default=None):
+    return env.get(name, default)
+
+
+def _int(env, name: str, default: str) -> int:
+    raw = env.get(name, default)
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer, got {raw!r}") from None
+
+
+def _float(env, name: str, default: str) -> float:
+    raw = env.get(name, default)
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number, got {raw!r}") from None
+
+
+def _bool(env, name: str, default: str) -> bool:
+    return env.get(name, default).lower() == "true"
+
+
+def _list(env, name: str, default: str, lower: bool = False) -> tuple:
+    vals = [x.strip() for x in (env.get(name) or default or "").split(",") if x.strip()]
+    return tuple(x.lower() for x in vals) if lower else tuple(vals)
+
+
+def _weights(env, name: str, default: str) -> dict:
+    out = {}
+    for x in env.get(name, default).split(","):
+        if ":" not in x:
+            continue
+        k, v = x.split(":", 1)
+        try:
+            out[k.strip().lower()] = float(v)
+        except ValueError:
+            raise ValueError(f"{name} entry {x.strip()!r} must look like book:weight") from None
+    return out
+
+
+# ---------- settings ----------
+
+@dataclass(frozen=True)
+class Config:
+    """All bot settings, parsed from the environment once per process and validated."""
+
+    TELEGRAM_BOT_TOKEN: str | None
+    TELEGRAM_CHAT_ID: str | None
+    # fan-out: comma-separated chats/channels; falls back to TELEGRAM_CHAT_ID
+    TELEGRAM_CHAT_IDS: tuple
+    TELEGRAM_PER_CHAT_PER_MIN: int
+    TELEGRAM_GLOBAL_PER_SEC: int
+    DELIVERY_FLUSH_TIMEOUT: float
+    # unsent outbox rows older than this are dropped, not sent late (odds move, games start)
+    OUTBOX_MAX_AGE_MINUTES: int
+    ODDS_API_KEY: str | None
+    REGION: str
+    # Regions fetched in parallel per event and merged by book key (e.g. "us,us2,eu")
+    REGIONS: tuple
+
+    TARGET_BOOKS: tuple
+    SPORTS: tuple
+
+    EVENTS_PER_SPORT: int
+    PREGAME_BUFFER_MINUTES: int
+    COOLDOWN_MINUTES: int
+
+    MAX_EDGE_CAP: float
+    ONE_PICK_PER_GAME: bool
+    # only score markets in gates.ALLOWED_MARKETS (player props)
+    STRICT_MARKETS: bool
+
+    VERIFY_BEFORE_SEND: bool
+    MAX_VERIFY_EVENTS: int
+    MAX_ODDS_MOVE_ABS: int
+
+    LINE_TOLERANCE: float
+    # price O/U lines off a per-player monotone curve fit across all books' main + alt lines
+    ENABLE_LINE_CURVES: bool
+    # also request each sport's alternate-line prop markets (more lines per curve; costs credits)
+    ENABLE_ALT_LINES: bool
+
+    # --- scan pipeline ---
+    PIPELINE_FETCH_WORKERS: int
+    # 0 = parse/score inline in fetcher threads; >0 = process pool of this size
+    PIPELINE_CPU_WORKERS: int
+    # events fetched but not yet aggregated, at most
+    PIPELINE_MAX_INFLIGHT: int
+
+    # --- shared Odds API rate limiter (all instances using this SQLite file and key) ---
+    # opt-in: path of the shared SQLite file; empty (default) disables it
+    RATE_LIMIT_DB: str
+    RATE_LIMIT_PER_SEC: float
+    RATE_LIMIT_BURST: int
+    # tokens discovery scans must leave for verify/closing-line fetches
+    RATE_LIMIT_RESERVE: int
+    # below this many remaining credits only verify/closing-line calls go out (0 = off)
+    CREDIT_FLOOR: int
+    # per-call ledger rows older than this are pruned
+    RATE_LIMIT_LEDGER_DAYS: int
+
+    # --- analytics export (needs pyarrow; empty EXPORT_DIR disables) ---
+    EXPORT_DIR: str
+    # "parquet" or "arrow" (Arrow IPC, memory-mappable)
+    EXPORT_FORMAT: str
+
+    # --- local board API (read-only JSON over HTTP; port 0 disables) ---
+    BOARD_API_HOST: str
+    BOARD_API_PORT: int
+    # keep serving this long after the run finishes
+    BOARD_API_LINGER_SECONDS: float
+
+    # --- stake sizing (simultaneous Kelly over every bet sent in a run) ---
+    # fraction of full Kelly actually staked
+    KELLY_MULTIPLIER: float
+    # most of the bankroll one run may put at risk, and any single bet
+    KELLY_BANKROLL_CAP: float
+    KELLY_MAX_BET: float
+    # up to this many bets outcomes are enumerated exactly, beyond it a moment model is used
+    KELLY_EXACT_MAX_BETS: int
+
+    # --- consensus weighting ---
+    # "book:weight" pairs; sharp books count more, soft books less, unlisted books 1.0
+    BOOK_WEIGHTS: dict
+    # a book's weight halves for every this-many minutes its last_update lags the freshest book
+    STALE_HALF_LIFE_MINUTES: float
+
+    # --- STALE quote detector (target book lagging a market-wide move) ---
+    ENABLE_STALE_ALERTS: bool
+    STALE_MIN_DELTA: float
+    STALE_MIN_LAG_SECONDS: float
+    STALE_MIN_BOOKS: int
+    STALE_MAX_ALERTS: int
+    STALE_REFETCH: bool
+
+    # --- SHARP singles ---
+    SHARP_MAX_SINGLES: int
+    SHARP_MIN_BOOKS: int
+    SHARP_MIN_P: float
+    SHARP_MIN_EDGE: float
+    SHARP_MIN_EV: float
+    SHARP_MIN_ODDS: int
+    SHARP_MAX_ODDS: int
+
+    # --- SHARP builder ---
+    ENABLE_SHARP_BUILDER: bool
+    BUILDER_LEGS: int
+    BUILDER_MIN_DEC: float
+    BUILDER_MAX_DEC: float
+
+    # --- LOTTO 3-leg ---
+    ENABLE_LOTTO_3LEG: bool
+    LOTTO_LEGS: int
+    LOTTO_MIN_ODDS: int
+    LOTTO_MAX_ODDS: int
+    LOTTO_MIN_BOOKS: int
+    LOTTO_MIN_EDGE: float
+    LOTTO_MIN_EV: float
+    LOTTO_MAX_TOTAL_DEC: float
+
+    # --- PLUS-MONEY bigger wins ---
+    ENABLE_PLUS_SHOTS: bool
+    PLUS_MAX_PICKS: int
+    PLUS_MIN_ODDS: int
+    PLUS_MAX_ODDS: int
+    PLUS_MIN_BOOKS: int
+    PLUS_MIN_EDGE: float
+    PLUS_MIN_EV: float
+
+    # --- High-variance parlay (bigger payout) ---
+    ENABLE_HIGHVAR_3LEG: bool
+    HIGHVAR_LEGS: int
+    HIGHVAR_MIN_ODDS: int
+    HIGHVAR_MAX_ODDS: int
+    HIGHVAR_MIN_TOTAL_DEC: float
+    HIGHVAR_MAX_TOTAL_DEC: float
+
+    def validate(self) -> "Config":
+        """Raise ValueError on settings that can never produce a sane run."""
+        errors = []
+
+        for lo, hi in (
+            ("SHARP_MIN_ODDS", "SHARP_MAX_ODDS"),
+            ("LOTTO_MIN_ODDS", "LOTTO_MAX_ODDS"),
+            ("PLUS_MIN_ODDS", "PLUS_MAX_ODDS"),
+            ("HIGHVAR_MIN_ODDS", "HIGHVAR_MAX_ODDS"),
+            ("BUILDER_MIN_DEC", "BUILDER_MAX_DEC"),
+            ("HIGHVAR_MIN_TOTAL_DEC", "HIGHVAR_MAX_TOTAL_DEC"),
+        ):
+            if getattr(self, lo) > getattr(self, hi):
+                errors.append(f"{lo} ({getattr(self, lo)}) > {hi} ({getattr(self, hi)})")
+
+        for name in ("BUILDER_LEGS", "LOTTO_LEGS", "HIGHVAR_LEGS"):
+            if getattr(self, name) < 2:
+                errors.append(f"{name} must be >= 2")
+
+        for name in (
+            "EVENTS_PER_SPORT", "PREGAME_BUFFER_MINUTES", "COOLDOWN_MINUTES", "MAX_VERIFY_EVENTS",
+            "MAX_ODDS_MOVE_ABS", "LINE_TOLERANCE", "STALE_HALF_LIFE_MINUTES", "STALE_MIN_LAG_SECONDS",
+            "SHARP_MAX_SINGLES", "PLUS_MAX_PICKS", "STALE_MAX_ALERTS",
+        ):
+            if getattr(self, name) < 0:
+                errors.append(f"{name} must be >= 0")
+
+        if self.RATE_LIMIT_PER_SEC <= 0:
+            errors.append("RATE_LIMIT_PER_SEC must be > 0")
+        if self.RATE_LIMIT_BURST < 1:
+            errors.append("RATE_LIMIT_BURST must be >= 1")
+        if not 0 <= self.RATE_LIMIT_RESERVE < self.RATE_LIMIT_BURST:
+            errors.append("RATE_LIMIT_RESERVE must be >= 0 and < RATE_LIMIT_BURST")
+        if self.CREDIT_FLOOR < 0:
+            errors.append("CREDIT_FLOOR must be >= 0")
+        if self.RATE_LIMIT_LEDGER_DAYS < 1:
+            errors.append("RATE_LIMIT_LEDGER_DAYS must be >= 1")
+
+        if self.EXPORT_FORMAT not in ("parquet", "arrow"):
+            errors.append("EXPORT_FORMAT must be parquet or arrow")
+
+        if not 0 <= self.BOARD_API_PORT <= 65535:
+            errors.append("BOARD_API_PORT must be between 0 and 65535")
+        if self.BOARD_API_LINGER_SECONDS < 0:
+            errors.append("BOARD_API_LINGER_SECONDS must be >= 0")
+
+        if not 0.0 < self.KELLY_MULTIPLIER <= 1.0:
+            errors.append("KELLY_MULTIPLIER must be > 0 and <= 1")
+        if not 0.0 < self.KELLY_MAX_BET <= self.KELLY_BANKROLL_CAP <= 1.0:
+            errors.append("need 0 < KELLY_MAX_BET <= KELLY_BANKROLL_CAP <= 1")
+        if not 0 <= self.KELLY_EXACT_MAX_BETS <= 20:
+            errors.append("KELLY_EXACT_MAX_BETS must be between 0 and 20")
+
+        if self.PIPELINE_CPU_WORKERS < 0:
+            errors.append("PIPELINE_CPU_WORKERS must be >= 0")
+
+        for name in ("TELEGRAM_PER_CHAT_PER_MIN", "TELEGRAM_GLOBAL_PER_SEC", "OUTBOX_MAX_AGE_MINUTES",
+                     "PIPELINE_FETCH_WORKERS", "PIPELINE_MAX_INFLIGHT"):
+            if getattr(self, name) < 1:
+                errors.append(f"{name} must be >= 1")
+
+        if not 0.0 < self.SHARP_MIN_P < 1.0:
+            errors.append("SHARP_MIN_P must be between 0 and 1")
+        if self.MAX_EDGE_CAP <= 0:
+            errors.append("MAX_EDGE_CAP must be > 0")
+        if not self.REGIONS:
+            errors.append("REGIONS/REGION must name at least one region")
+        if any(w < 0 for w in self.BOOK_WEIGHTS.values()):
+            errors.append("BOOK_WEIGHTS must be non-negative")
+
+        if errors:
+            raise ValueError("Invalid configuration: " + "; ".join(errors))
+        return self
+
+
+def load_config(env=None) -> Config:
+    env = os.environ if env is None else env
+    region = _str(env, "REGION", "us")
+    chat_id = _str(env, "TELEGRAM_CHAT_ID")
+
+    return Config(
+        TELEGRAM_BOT_TOKEN=_str(env, "TELEGRAM_BOT_TOKEN"),
+        TELEGRAM_CHAT_ID=chat_id,
+        TELEGRAM_CHAT_IDS=_list(env, "TELEGRAM_CHAT_IDS", chat_id),
+        TELEGRAM_PER_CHAT_PER_MIN=_int(env, "TELEGRAM_PER_CHAT_PER_MIN", "20"),
+        TELEGRAM_GLOBAL_PER_SEC=_int(env, "TELEGRAM_GLOBAL_PER_SEC", "25"),
+        DELIVERY_FLUSH_TIMEOUT=_float(env, "DELIVERY_FLUSH_TIMEOUT", "120"),
+        OUTBOX_MAX_AGE_MINUTES=_int(env, "OUTBOX_MAX_AGE_MINUTES", "30"),
+        ODDS_API_KEY=_str(env, "ODDS_API_KEY"),
+        REGION=region,
+        REGIONS=_list(env, "REGIONS", region),
+
+        TARGET_BOOKS=_list(env, "TARGET_BOOKS", "draftkings,fanduel,betmgm,fanatics", lower=True),
+        # ✅ NHL REMOVED
+        SPORTS=_list(
+            env, "SPORTS",
+            "americanfootball_nfl,basketball_nba,baseball_mlb,"
+            "soccer_epl,soccer_usa_mls,americanfootball_ncaaf,basketball_ncaab",
+        ),
+
+        EVENTS_PER_SPORT=_int(env, "EVENTS_PER_SPORT", "6"),
+        PREGAME_BUFFER_MINUTES=_int(env, "PREGAME_BUFFER_MINUTES", "15"),
+        COOLDOWN_MINUTES=_int(env, "COOLDOWN_MINUTES", "90"),
+
+        MAX_EDGE_CAP=_float(env, "MAX_EDGE_CAP", "0.08"),
+        ONE_PICK_PER_GAME=_bool(env, "ONE_PICK_PER_GAME", "true"),
+        STRICT_MARKETS=_bool(env, "STRICT_MARKETS", "false"),
+
+        VERIFY_BEFORE_SEND=_bool(env, "VERIFY_BEFORE_SEND", "true"),
+        MAX_VERIFY_EVENTS=_int(env, "MAX_VERIFY_EVENTS", "4"),
+        MAX_ODDS_MOVE_ABS=_int(env, "MAX_ODDS_MOVE_ABS", "25"),
+
+        LINE_TOLERANCE=_float(env, "LINE_TOLERANCE", "1.0"),
+        ENABLE_LINE_CURVES=_bool(env, "ENABLE_LINE_CURVES", "true"),
+        ENABLE_ALT_LINES=_bool(env, "ENABLE_ALT_LINES", "false"),
+
+        PIPELINE_FETCH_WORKERS=_int(env, "PIPELINE_FETCH_WORKERS", "4"),
+        PIPELINE_CPU_WORKERS=_int(env, "PIPELINE_CPU_WORKERS", "0"),
+        PIPELINE_MAX_INFLIGHT=_int(env, "PIPELINE_MAX_INFLIGHT", "8"),
+
+        RATE_LIMIT_DB=_str(env, "RATE_LIMIT_DB", ""),
+        RATE_LIMIT_PER_SEC=_float(env, "RATE_LIMIT_PER_SEC", "5"),
+        RATE_LIMIT_BURST=_int(env, "RATE_LIMIT_BURST", "10"),
+        RATE_LIMIT_RESERVE=_int(env, "RATE_LIMIT_RESERVE", "2"),
+        CREDIT_FLOOR=_int(env, "CREDIT_FLOOR", "0"),
+        RATE_LIMIT_LEDGER_DAYS=_int(env, "RATE_LIMIT_LEDGER_DAYS", "7"),
+
+        EXPORT_DIR=_str(env, "EXPORT_DIR", ""),
+        EXPORT_FORMAT=_str(env, "EXPORT_FORMAT", "parquet").lower(),
+
+        BOARD_API_HOST=_str(env, "BOARD_API_HOST", "127.0.0.1"),
+        BOARD_API_PORT=_int(env, "BOARD_API_PORT", "0"),
+        BOARD_API_LINGER_SECONDS=_float(env, "BOARD_API_LINGER_SECONDS", "0"),
+
+        KELLY_MULTIPLIER=_float(env, "KELLY_MULTIPLIER", "0.25"),
+        KELLY_BANKROLL_CAP=_float(env, "KELLY_BANKROLL_CAP", "0.03"),
+        KELLY_MAX_BET=_float(env, "KELLY_MAX_BET", "0.01"),
+        KELLY_EXACT_MAX_BETS=_int(env, "KELLY_EXACT_MAX_BETS", "8"),
+
+        BOOK_WEIGHTS=_weights(env, "BOOK_WEIGHTS", "pinnacle:2.0,circasports:1.5,betonlineag:1.25"),
+        STALE_HALF_LIFE_MINUTES=_float(env, "STALE_HALF_LIFE_MINUTES", "10"),
+
+        ENABLE_STALE_ALERTS=_bool(env, "ENABLE_STALE_ALERTS", "false"),
+        STALE_MIN_DELTA=_float(env, "STALE_MIN_DELTA", "0.03"),
+        STALE_MIN_LAG_SECONDS=_float(env, "STALE_MIN_LAG_SECONDS", "120"),
+        STALE_MIN_BOOKS=_int(env, "STALE_MIN_BOOKS", "3"),
+        STALE_MAX_ALERTS=_int(env, "STALE_MAX_ALERTS", "3"),
+        STALE_REFETCH=_bool(env, "STALE_REFETCH", "true"),
+
+        SHARP_MAX_SINGLES=_int(env, "SHARP_MAX_SINGLES", "2"),
+        SHARP_MIN_BOOKS=_int(env, "SHARP_MIN_BOOKS", "4"),
+        SHARP_MIN_P=_float(env, "SHARP_MIN_P", "0.53"),
+        SHARP_MIN_EDGE=_float(env, "SHARP_MIN_EDGE", "0.014"),
+        SHARP_MIN_EV=_float(env, "SHARP_MIN_EV", "0.012"),
+        SHARP_MIN_ODDS=_int(env, "SHARP_MIN_ODDS", "-220"),
+        SHARP_MAX_ODDS=_int(env, "SHARP_MAX_ODDS", "175"),
+
+        ENABLE_SHARP_BUILDER=_bool(env, "ENABLE_SHARP_BUILDER", "true"),
+        BUILDER_LEGS=_int(env, "BUILDER_LEGS", "3"),
+        BUILDER_MIN_DEC=_float(env, "BUILDER_MIN_DEC", "3.0"),
+        BUILDER_MAX_DEC=_float(env, "BUILDER_MAX_DEC", "7.0"),
+
+        ENABLE_LOTTO_3LEG=_bool(env, "ENABLE_LOTTO_3LEG", "true"),
+        LOTTO_LEGS=_int(env, "LOTTO_LEGS", "3"),
+        LOTTO_MIN_ODDS=_int(env, "LOTTO_MIN_ODDS", "110"),
+        LOTTO_MAX_ODDS=_int(env, "LOTTO_MAX_ODDS", "350"),
+        LOTTO_MIN_BOOKS=_int(env, "LOTTO_MIN_BOOKS", "4"),
+        LOTTO_MIN_EDGE=_float(env, "LOTTO_MIN_EDGE", "0.018"),
+        LOTTO_MIN_EV=_float(env, "LOTTO_MIN_EV", "0.015"),
+        LOTTO_MAX_TOTAL_DEC=_float(env, "LOTTO_MAX_TOTAL_DEC", "18.0"),
+
+        ENABLE_PLUS_SHOTS=_bool(env, "ENABLE_PLUS_SHOTS", "true"),
+        PLUS_MAX_PICKS=_int(env, "PLUS_MAX_PICKS", "1"),
+        PLUS_MIN_ODDS=_int(env, "PLUS_MIN_ODDS", "160"),
+        PLUS_MAX_ODDS=_int(env, "PLUS_MAX_ODDS", "320"),
+        PLUS_MIN_BOOKS=_int(env, "PLUS_MIN_BOOKS", "5"),
+        PLUS_MIN_EDGE=_float(env, "PLUS_MIN_EDGE", "0.020"),
+        PLUS_MIN_EV=_float(env, "PLUS_MIN_EV", "0.015"),
+
+        ENABLE_HIGHVAR_3LEG=_bool(env, "ENABLE_HIGHVAR_3LEG", "true"),
+        HIGHVAR_LEGS=_int(env, "HIGHVAR_LEGS", "3"),
+        HIGHVAR_MIN_ODDS=_int(env, "HIGHVAR_MIN_ODDS", "140"),
+        HIGHVAR_MAX_ODDS=_int(env, "HIGHVAR_MAX_ODDS", "350"),
+        HIGHVAR_MIN_TOTAL_DEC=_float(env, "HIGHVAR_MIN_TOTAL_DEC", "6.0"),
+        HIGHVAR_MAX_TOTAL_DEC=_float(env, "HIGHVAR_MAX_TOTAL_DEC", "20.0"),
+    ).validate()
+
+
+# parsed once per process; every module reads settings from here
+CONFIG = load_config()
@@ -0,0 +1,112 @@
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+from probability import weighted_median
+
+
+class LineCurve(NamedTuple):
+    """
+    Monotone P(Over) vs line for one (market, participant); lines ascending,
+    probs non-increasing, `books` the set of books quoting each line.
+    """
+    lines: list
+    p_over: list
+    books: list
+
+
+def _pav_non_increasing(ys: list[float], ws: list[float]) -> list[float]:
+    """Weighted pool-adjacent-violators fit constrained to be non-increasing."""
+    blocks = []  # [weighted sum, weight, n points]
+    for y, w in zip(ys, ws):
+        blocks.append([y * w, w, 1])
+        while len(blocks) > 1 and blocks[-2][0] / blocks[-2][1] < blocks[-1][0] / blocks[-1][1]:
+            s, w2, n = blocks.pop()
+            blocks[-1][0] += s
+            blocks[-1][1] += w2
+            blocks[-1][2] += n
+
+    out = []
+    for s, w, n in blocks:
+        out.extend([s / w] * n)
+    return out
+
+
+def fit_line_curve(over_entries: list[dict]) -> LineCurve | None:
+    """
+    Fit one P(Over)-vs-line curve from Over quotes carrying a no-vig prob.
+    Each line's point is the weighted median across books posting it; the
+    points are then made monotone (higher line, lower P(Over)) with weighted
+    isotonic regression. None if no quote has a no-vig prob.
+    """
+    by_line = {}
+    books = {}
+    for e in over_entries:
+        if "fair_prob_in_book" not in e or e.get("line") is None:
+            continue
+        w = e.get("w", 1.0)
+        if w <= 0:
+            continue
+        by_line.setdefault(float(e["line"]), ([], []))
+        by_line[float(e["line"])][0].append(float(e["fair_prob_in_book"]))
+        by_line[float(e["line"])][1].append(w)
+        books.setdefault(float(e["line"]), set()).add(e["book"])
+
+    if not by_line:
+        return None
+
+    lines = sorted(by_line)
+    points = [weighted_median(*by_line[ln]) for ln in lines]
+    weights = [sum(by_line[ln][1]) for ln in lines]
+    return LineCurve(lines, _pav_non_increasing(points, weights), [frozenset(books[ln]) for ln in lines])
+
+
+def base_market(market: str) -> str:
+    """Alternate-line markets ("<market>_alternate") share their base market's key."""
+    return market.removesuffix("_alternate")
+
+
+def build_line_curves(idx: dict, keys: set | None = None) -> dict:
+    """
+    One curve per (market, participant) from every book's no-vig Over/Under
+    quotes, main and alternate lines alike; with `keys`, only for those pairs.
+    Built once per snapshot so pricing any line is a bisect + interpolation.
+    """
+    curves = {}
+    for (market, participant, side), entries in idx.items():
+        if side != "Over" or (keys is not None and (market, participant) not in keys):
+            continue
+        curve = fit_line_curve(entries)
+        if curve is not None:
+            curves[(market, participant)] = curve
+
+    return curves
+
+
+def curve_prob(curve: LineCurve, side: str, target_line: float, tol: float) -> tuple[float, int] | None:
+    """
+    Fair probability of `side` at `target_line`, linearly interpolated between
+    fitted lines, and the number of books supporting that point: those quoting
+    the bracketing lines or any line within `tol` of it. Lines outside the
+    quoted range are not priced (there is no slope to extend the curve with).
+    """
+    lines, probs = curve.lines, curve.p_over
+    if target_line < lines[0] or target_line > lines[-1]:
+        return None
+
+    i = bisect_left(lines, target_line)
+    if lines[i] == target_line:
+        p = probs[i]
+        lo = hi = i
+    else:
+        x0, x1 = lines[i - 1], lines[i]
+        y0, y1 = probs[i - 1], probs[i]
+        p = y0 + (y1 - y0) * (target_line - x0) / (x1 - x0)
+        lo, hi = i - 1, i
+
+    near_lo = bisect_left(lines, target_line - tol)
+    near_hi = bisect_right(lines, target_line + tol) - 1
+    books = set()
+    for j in range(min(lo, near_lo), max(hi, near_hi) + 1):
+        books |= curve.books[j]
+
+    return (p if side == "Over" else 1.0 - p), len(books)
@@ -0,0 +1,218 @@
+import hashlib
+import threading
+import time
+from collections import deque
+
+from storage import outbox_add, outbox_expire, outbox_pending, outbox_mark_sent
+
+TELEGRAM_MAX_CHARS = 4096
+
+# Telegram: ~1 msg/sec into one chat; global bot limit is ~30 msgs/sec
+PER_CHAT_MIN_INTERVAL = 1.0
+RETRY_DELAYS = (2, 5, 10)
+
+
+def split_message(text: str, limit: int = TELEGRAM_MAX_CHARS) -> list[str]:
+    """
+    Split a message into chunks of at most `limit` characters, preferring
+    section boundaries (blank lines), then line boundaries, then a hard cut.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    # (separator that joined the piece to the one before it, piece)
+    pieces = []
+    for section in text.split("\n\n"):
+        if len(section) <= limit:
+            pieces.append(("\n\n", section))
+            continue
+        sep = "\n\n"
+        for line in section.split("\n"):
+            while len(line) > limit:
+                pieces.append((sep, line[:limit]))
+                line = line[limit:]
+                sep = ""
+            pieces.append((sep, line))
+            sep = "\n"
+
+    chunks = []
+    cur = ""
+    for sep, piece in pieces:
+        if not cur:
+            sep = ""
+        if len(cur) + len(sep) + len(piece) <= limit:
+            cur = cur + sep + piece
+        else:
+            chunks.append(cur)
+            cur = piece
+    if cur:
+        chunks.append(cur)
+    return [c for c in chunks if c.strip()]
+
+
+class DeliveryQueue:
+    """
+    Background Telegram sender.
+
+    Messages are split, fanned out to every chat and written to the SQLite
+    outbox before being queued, so a crash mid-run leaves them pending for the
+    next run instead of lost; rows are marked sent only after Telegram accepts
+    them. Rows older than `max_age_minutes` are dropped at start rather than
+    sent late. A single worker thread keeps per-chat order and enforces per-chat
+    (1/sec, `per_chat_per_min`) and global (`global_per_sec`) rate limits.
+    """
+
+    def __init__(self, token: str, chat_ids: list[str], per_chat_per_min: int, global_per_sec: int,
+                 max_age_minutes: int = 30):
+        self.token = token
+        self.chat_ids = list(chat_ids)
+        self.per_chat_per_min = per_chat_per_min
+        self.global_per_sec = global_per_sec
+        self.max_age_minutes = max_age_minutes
+
+        self._cond = threading.Condition()
+        self._pending = {}      # chat_id -> deque of [msg_id, text, attempts, not_before]
+        self._chat_sends = {}   # chat_id -> deque of monotonic send times (last 60s)
+        self._global_sends = deque()
+        self._inflight = 0
+        self._closed = False
+        self._seq = 0
+        self._run_id = f"{time.time():.6f}"
+        self._thread = None
+
+    # ----- producer side -----
+
+    def start(self) -> None:
+        """Re-queue what a previous run left unsent (if still fresh), then start the worker."""
+        expired = outbox_expire(self.max_age_minutes)
+        if expired:
+            print(f"⚠️ Dropped {expired} outbox message(s) older than {self.max_age_minutes} min")
+        with self._cond:
+            for msg_id, chat_id, text in outbox_pending(self.max_age_minutes):
+                self._push(chat_id, msg_id, text)
+        self._thread = threading.Thread(target=self._run, name="telegram-delivery", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, text: str) -> int:
+        """Queue `text` for every chat; never blocks on the network. Returns chunks queued."""
+        chunks = split_message(text)
+        queued = 0
+        with self._cond:
+            for chunk in chunks:
+                self._seq += 1
+                for chat_id in self.chat_ids:
+                    msg_id = hashlib.sha1(f"{self._run_id}|{self._seq}|{chat_id}".encode()).hexdigest()
+                    if outbox_add(msg_id, chat_id, chunk):
+                        self._push(chat_id, msg_id, chunk)
+                        queued += 1
+            self._cond.notify_all()
+        return queued
+
+    def flush(self, timeout: float) -> bool:
+        """Wait until everything queued is delivered (or given up on). True if drained."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._inflight or any(self._pending.values()):
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cond.wait(timeout=left)
+        return True
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _push(self, chat_id: str, msg_id: str, text: str) -> None:
+        self._pending.setdefault(str(chat_id), deque()).append([msg_id, text, 0, 0.0])
+
+    # ----- worker side -----
+
+    def _next_ready(self, now: float):
+        """Return (chat_id, None) for the next sendable chat, else (None, seconds_to_wait)."""
+        while self._global_sends and now - self._global_sends[0] >= 1.0:
+            self._global_sends.popleft()
+        global_wait = 0.0
+        if len(self._global_sends) >= self.global_per_sec:
+            global_wait = 1.0 - (now - self._global_sends[0])
+
+        best_wait = None
+        for chat_id, q in self._pending.items():
+            if not q:
+                continue
+            sends = self._chat_sends.setdefault(chat_id, deque())
+            while sends and now - sends[0] >= 60.0:
+                sends.popleft()
+
+            wait = max(global_wait, q[0][3] - now)
+            if sends:
+                wait = max(wait, PER_CHAT_MIN_INTERVAL - (now - sends[-1]))
+            if len(sends) >= self.per_chat_per_min:
+                wait = max(wait, 60.0 - (now - sends[0]))
+
+            if wait <= 0:
+                return chat_id, None
+            if best_wait is None or wait < best_wait:
+                best_wait = wait
+        return None, best_wait
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed and not any(self._pending.values()):
+                        return
+                    chat_id, wait = self._next_ready(time.monotonic())
+                    if chat_id is not None:
+                        item = self._pending[chat_id].popleft()
+                        self._inflight += 1
+                        break
+                    self._cond.wait(timeout=wait)
+
+            status, retry_after = self._post(chat_id, item[1])
+
+            with self._cond:
+                now = time.monotonic()
+                self._chat_sends.setdefault(chat_id, deque()).append(now)
+                self._global_sends.append(now)
+
+                if status == "ok":
+                    outbox_mark_sent(item[0])
+                elif status == "drop":
+                    # Telegram rejected the message itself; retrying won't help
+                    outbox_mark_sent(item[0])
+                elif item[2] < len(RETRY_DELAYS):
+                    item[3] = now + max(retry_after or 0, RETRY_DELAYS[item[2]])
+                    item[2] += 1
+                    self._pending[chat_id].appendleft(item)
+                else:
+                    # stays pending in the outbox; the next run retries it
+                    print(f"⚠️ Telegram send failed for chat {chat_id}; left in outbox")
+
+                self._inflight -= 1
+                self._cond.notify_all()
+
+    def _post(self, chat_id: str, text: str):
+        """Returns (status, retry_after_seconds); status is "ok", "retry" or "drop"."""
+        import requests  # lazy: keeps it off the startup path
+
+        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        payload = {"chat_id": chat_id, "text": text, "disable_web_page_preview": True}
+        try:
+            r = requests.post(url, json=payload, timeout=35)
+            if r.status_code == 429:
+                try:
+                    retry_after = r.json().get("parameters", {}).get("retry_after")
+                except Exception:
+                    retry_after = None
+                return "retry", retry_after
+            if 500 <= r.status_code < 600:
+                return "retry", None
+            if r.status_code >= 400:
+                print(f"⚠️ Telegram rejected message for chat {chat_id}: HTTP {r.status_code} {r.text[:200]}")
+                return "drop", None
+            return "ok", None
+        except Exception as e:
+            print("⚠️ Telegram send error:", str(e))
+            return "retry", None
@@ -0,0 +1,112 @@
+import os
+
+from models import Candidate
+
+TABLES = ("quotes", "candidates", "picks")
+PARTITIONING = ["date", "sport"]
+
+
+class RunExporter:
+    """
+    Collects one run's normalized quotes, scored candidates (with tier
+    membership) and sent picks as columns, and writes them as hive-partitioned
+    columnar files: <root>/<table>/date=YYYY-MM-DD/sport=<sport>/run-<ts>-<n>.<ext>.
+
+    "parquet" is the compact default; "arrow" writes Arrow IPC files that
+    readers can memory-map without decoding. pyarrow is optional: without it
+    the exporter says so once and turns itself off.
+    """
+
+    def __init__(self, root: str, fmt: str, run_ts: int, run_date: str):
+        self.root = root
+        self.fmt = fmt
+        self.run_ts = run_ts
+        self.run_date = run_date
+        self.enabled = True
+        self._cols = {t: {} for t in TABLES}
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("⚠️ EXPORT_DIR is set but pyarrow is not installed; skipping export")
+            self.enabled = False
+
+    def _append(self, table: str, row: dict) -> None:
+        cols = self._cols[table]
+        for k, v in row.items():
+            cols.setdefault(k, []).append(v)
+
+    def add_quotes(self, sport: str, event_id: str, quotes: list) -> None:
+        """`quotes` are scan.ScanResult.quotes tuples."""
+        if not self.enabled:
+            return
+        for market, player, side, line, book, price, fair_prob, weight, ts in quotes:
+            self._append("quotes", {
+                "run_ts": self.run_ts, "date": self.run_date, "sport": sport, "event_id": event_id,
+                "market": market, "player": player, "side": side, "line": line, "book": book,
+                "price": price, "fair_prob": fair_prob, "weight": weight, "last_update": ts,
+            })
+
+    def add_candidate(self, c: Candidate, sharp: bool, lotto: bool, plus: bool, highvar: bool) -> None:
+        if not self.enabled:
+            return
+        self._append("candidates", {
+            "run_ts": self.run_ts, "date": self.run_date, "sport": c.sport, "event_id": c.event_id,
+            "event": c.event, "market": c.market, "player": c.player, "side": c.side, "line": c.line,
+            "book": c.target_book_used, "odds": c.target_odds, "p_model": c.p_model,
+            "books_count": c.books_count, "ev": c.ev, "edge": c.edge, "score": c.score,
+            "tier_sharp": sharp, "tier_lotto": lotto, "tier_plus": plus, "tier_highvar": highvar,
+        })
+
+    def add_picks(self, section: str, picks: list[Candidate], stakes: list[float]) -> None:
+        """Picks as sent, with their bankroll fractions; parlay legs carry the whole parlay's stake."""
+        if not self.enabled:
+            return
+        for c, stake in zip(picks, stakes):
+            self._append("picks", {
+                "run_ts": self.run_ts, "date": self.run_date, "sport": c.sport, "event_id": c.event_id,
+                "event": c.event, "section": section, "market": c.market, "player": c.player,
+                "side": c.side, "line": c.line, "book": c.target_book_used, "odds": c.target_odds,
+                "p_model": c.p_model, "ev": c.ev, "kelly_frac": c.kelly_frac, "stake": stake,
+            })
+
+    def write(self) -> None:
+        if not self.enabled:
+            return
+
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        ext = "parquet" if self.fmt == "parquet" else "arrow"
+        for table, cols in self._cols.items():
+            if not cols:
+                continue
+            ds.write_dataset(
+                pa.table(cols),
+                os.path.join(self.root, table),
+                format="parquet" if self.fmt == "parquet" else "ipc",
+                partitioning=PARTITIONING,
+                partitioning_flavor="hive",
+                basename_template=f"run-{self.run_ts}-{{i}}.{ext}",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+
+
+def open_dataset(root: str, table: str, fmt: str = "parquet"):
+    """
+    Lazily open an exported table for analysis. Files are memory-mapped, and
+    filters on `date`/`sport` prune whole partitions before any file is read;
+    other column filters are pushed down to the scan:
+
+        dset = open_dataset("exports", "candidates")
+        dset.to_table(filter=(ds.field("sport") == "basketball_nba") & (ds.field("ev") > 0.02))
+    """
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    return ds.dataset(
+        os.path.abspath(os.path.join(root, table)),
+        format="parquet" if fmt == "parquet" else "ipc",
+        partitioning="hive",
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
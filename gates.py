@@ -1,4 +1,7 @@
 from dataclasses import dataclass
+from typing import Callable, NamedTuple, Optional
+
+from models import Candidate
 
 @dataclass
 class GateResult:
@@ -37,7 +40,68 @@ ALLOWED_MARKETS = {
     "player_assists",
 }
 
-def quality_gates(c: dict, strict_mode: bool, nhl_require_confirmed_goalie: bool) -> GateResult:
+# ---------- batch outcome gates (run before any probability math) ----------
+
+class OutcomeGate(NamedTuple):
+    """
+    `check(key, entries)` returns the entries to keep (possibly filtered) or None
+    to reject the outcome; rejections are counted under `reason`.
+    """
+    reason: str
+    check: Callable[[tuple, list], Optional[list]]
+
+
+def outcome_gates(strict_mode: bool, target_books) -> list[OutcomeGate]:
+    """Cheapest checks first; each one shrinks the batch the next one sees."""
+    targets = set(target_books)
+
+    def fields(key, entries):
+        return entries if all(key) else None
+
+    def market(key, entries):
+        return entries if key[0] in ALLOWED_MARKETS else None
+
+    def target_book(key, entries):
+        # no target-book quote means nothing to bet, so skip its consensus entirely
+        return entries if any(e["book"] in targets for e in entries) else None
+
+    def line(key, entries):
+        # For O/U props, a numeric line is required
+        if key[2] not in ("Over", "Under"):
+            return entries
+        kept = [e for e in entries if e.get("line") is not None]
+        return kept if any(e["book"] in targets for e in kept) else None
+
+    gates = [OutcomeGate("missing_field", fields)]
+    if strict_mode:
+        gates.append(OutcomeGate("market_not_allowed", market))
+    gates.append(OutcomeGate("no_target_book", target_book))
+    gates.append(OutcomeGate("missing_line", line))
+    return gates
+
+
+def run_gates(batch: list[tuple], gates: list[OutcomeGate], counters: dict) -> list[tuple]:
+    """Apply gates to a whole batch of (key, entries) outcomes; bumps counters[reason] per rejection."""
+    for gate in gates:
+        kept = []
+        for key, entries in batch:
+            out = gate.check(key, entries)
+            if out is not None:
+                kept.append((key, out))
+        if len(kept) != len(batch):
+            counters[gate.reason] = counters.get(gate.reason, 0) + len(batch) - len(kept)
+        batch = kept
+    return batch
+
+
+def event_gate(commence_epoch: float | None, cutoff_epoch: float) -> GateResult:
+    """Reject a snapshot whose event starts before the pregame cutoff (e.g. it moved up since discovery)."""
+    if commence_epoch is not None and commence_epoch < cutoff_epoch:
+        return GateResult(False, "window")
+    return GateResult(True, "ok")
+
+
+def quality_gates(c: Candidate, strict_mode: bool, nhl_require_confirmed_goalie: bool) -> GateResult:
     """
     Keep this gate about data integrity, not "trying to predict the sport".
     The EV/no-vig + multi-book checks already handle pricing quality.
@@ -45,21 +109,21 @@ def quality_gates(c: dict, strict_mode: bool, nhl_require_confirmed_goalie: bool
 
     # Must have sport/event/market/player/side
     for k in ("sport", "event", "market", "player", "side"):
-        if not c.get(k):
+        if not getattr(c, k):
             return GateResult(False, f"missing_{k}")
 
-    market = c.get("market")
+    market = c.market
     if strict_mode and market not in ALLOWED_MARKETS:
         return GateResult(False, "market_not_allowed")
 
     # For O/U props, a numeric line is required
-    if c.get("side") in ("Over", "Under"):
-        if c.get("line") is None:
+    if c.side in ("Over", "Under"):
+        if c.line is None:
             return GateResult(False, "missing_line")
 
     # NHL goalie gate (only if you actually implement goalie confirmation elsewhere)
-    if nhl_require_confirmed_goalie and c.get("sport") == "icehockey_nhl":
-        if not c.get("goalie_confirmed"):
+    if nhl_require_confirmed_goalie and c.sport == "icehockey_nhl":
+        if not getattr(c, "goalie_confirmed", False):
             return GateResult(False, "goalie_unconfirmed")
 
     return GateResult(True, "ok")
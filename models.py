@@ -0,0 +1,58 @@
+from dataclasses import dataclass, field, replace
+
+from probability import implied_prob_american, kelly_fraction
+
+KELLY_CAP = 0.01
+
+
+@dataclass(frozen=True, slots=True)
+class Candidate:
+    """
+    One priced outcome at a target book; shared by bot, gates and scorer.
+
+    Immutable: derived fields (implied prob, edge, capped Kelly, score) are
+    computed once at construction, and re-pricing goes through `with_quote`,
+    which returns a new record.
+    """
+    sport: str
+    event_id: str
+    event: str
+    market: str
+    player: str
+    side: str
+    line: float | None
+    p_model: float
+    books_count: int
+    target_book_used: str
+    target_odds: int
+    ev: float
+    # tier's acceptable odds range, used when re-verifying
+    min_odds: int | None = None
+    max_odds: int | None = None
+
+    implied: float = field(init=False, repr=False, compare=False)
+    edge: float = field(init=False, repr=False, compare=False)
+    kelly_frac: float = field(init=False, repr=False, compare=False)
+    score: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        imp = implied_prob_american(self.target_odds)
+        edge = self.p_model - imp
+        object.__setattr__(self, "implied", imp)
+        object.__setattr__(self, "edge", edge)
+        object.__setattr__(self, "kelly_frac", min(kelly_fraction(self.p_model, self.target_odds), KELLY_CAP))
+        # a stable “quality” score (not a guarantee)
+        object.__setattr__(self, "score", (self.ev * 100.0) + (edge * 60.0) + (min(self.books_count, 10) * 0.5))
+
+    def for_tier(self, min_odds: int, max_odds: int) -> "Candidate":
+        return replace(self, min_odds=min_odds, max_odds=max_odds)
+
+    def with_quote(self, book: str, odds: int, p_model: float, books_count: int, ev: float) -> "Candidate":
+        return replace(
+            self,
+            target_book_used=book,
+            target_odds=int(odds),
+            p_model=float(p_model),
+            books_count=int(books_count),
+            ev=float(ev),
+        )
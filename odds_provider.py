@@ -1,20 +1,64 @@
+import json
+import threading
 import time
-import requests
-from config import ODDS_API_KEY, REGION
+from config import CONFIG
 
 BASE = "https://api.the-odds-api.com/v4"
 
 TIMEOUT = 12
 
+_limiter = None
 
-def _get(url: str, params: dict):
+# HTTP requests actually sent per endpoint (every region and retry costs credits)
+_calls = {"events": 0, "event-odds": 0}
+_calls_lock = threading.Lock()
+
+
+def api_calls() -> dict:
+    """Requests made so far in this process, per endpoint."""
+    with _calls_lock:
+        return dict(_calls)
+
+
+def _shared_limiter():
+    """Process-wide handle on the cross-instance limiter; None when RATE_LIMIT_DB is empty."""
+    global _limiter
+    if _limiter is None and CONFIG.RATE_LIMIT_DB:
+        from ratelimit import SharedRateLimiter
+        _limiter = SharedRateLimiter(
+            CONFIG.RATE_LIMIT_DB,
+            CONFIG.ODDS_API_KEY,
+            CONFIG.RATE_LIMIT_PER_SEC,
+            CONFIG.RATE_LIMIT_BURST,
+            CONFIG.RATE_LIMIT_RESERVE,
+            CONFIG.CREDIT_FLOOR,
+            CONFIG.RATE_LIMIT_LEDGER_DAYS,
+        )
+    return _limiter
+
+
+def _get(url: str, params: dict, raw: bool = False, priority: str = "scan", endpoint: str = "events"):
+    """
+    GET with retries; returns decoded JSON, or the undecoded body bytes when raw=True.
+    Every attempt first takes a token from the shared limiter at `priority`
+    ("verify"/"closing" ahead of "scan") and is counted under `endpoint`.
+    """
+    import requests  # lazy: only runs that actually hit the API pay for it
+
+    limiter = _shared_limiter()
     last_err = None
     for delay in (0, 1, 2):
+        if limiter is not None:
+            limiter.acquire(priority)
         try:
             if delay:
                 time.sleep(delay)
 
             r = requests.get(url, params=params, timeout=TIMEOUT)
+            with _calls_lock:
+                _calls[endpoint] += 1
+            if limiter is not None:
+                limiter.record(priority, r.status_code, r.headers)
 
             # IMPORTANT: print useful info for debugging
             if r.status_code >= 400:
@@ -27,7 +71,7 @@ def _get(url: str, params: dict):
                 continue
 
             r.raise_for_status()
-            return r.json()
+            return r.content if raw else r.json()
 
         except Exception as e:
             last_err = str(e)
@@ -36,22 +80,79 @@ def _get(url: str, params: dict):
 
 
 def get_events(sport_key: str):
-    if not ODDS_API_KEY:
+    if not CONFIG.ODDS_API_KEY:
         raise RuntimeError("Missing ODDS_API_KEY secret")
     url = f"{BASE}/sports/{sport_key}/events"
-    return _get(url, {"apiKey": ODDS_API_KEY})
+    return _get(url, {"apiKey": CONFIG.ODDS_API_KEY})
 
 
-def get_event_odds_multi_book(sport_key: str, event_id: str, markets: str):
-    if not ODDS_API_KEY:
-        raise RuntimeError("Missing ODDS_API_KEY secret")
+def merge_region_payloads(payloads: list[dict]) -> dict:
+    """
+    Combine per-region odds payloads for one event into a single snapshot.
+    Books quoted in several regions keep their most recently updated copy.
+    """
+    if len(payloads) == 1:
+        return payloads[0]
+
+    merged = dict(payloads[0])
+    books = {}
+    for data in payloads:
+        for bm in data.get("bookmakers", []):
+            key = (bm.get("key") or "").lower()
+            prev = books.get(key)
+            # ISO-8601 UTC strings from the API sort chronologically
+            if prev is None or (bm.get("last_update") or "") > (prev.get("last_update") or ""):
+                books[key] = bm
+
+    merged["bookmakers"] = list(books.values())
+    return merged
+
+
+def _get_event_odds_region(sport_key: str, event_id: str, markets: str, region: str, priority: str) -> bytes:
     url = f"{BASE}/sports/{sport_key}/events/{event_id}/odds"
     return _get(
         url,
         {
-            "apiKey": ODDS_API_KEY,
-            "regions": REGION,
+            "apiKey": CONFIG.ODDS_API_KEY,
+            "regions": region,
             "markets": markets,
             "oddsFormat": "american",
         },
-    )
\ No newline at end of file
+        raw=True,
+        priority=priority,
+        endpoint="event-odds",
+    )
+
+
+def get_event_odds_raw(sport_key: str, event_id: str, markets: str, priority: str = "scan") -> list[bytes]:
+    """
+    Undecoded odds bodies for one event, one per configured region.
+    Lets the scan pipeline hand bytes to worker processes and parse there.
+    """
+    if not CONFIG.ODDS_API_KEY:
+        raise RuntimeError("Missing ODDS_API_KEY secret")
+
+    if len(CONFIG.REGIONS) == 1:
+        return [_get_event_odds_region(sport_key, event_id, markets, CONFIG.REGIONS[0], priority)]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # one request per region, in parallel; a failed region only costs its books
+    def fetch(region):
+        try:
+            return _get_event_odds_region(sport_key, event_id, markets, region, priority)
+        except Exception as e:
+            print(f"[ODDS_API] region={region} failed: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=len(CONFIG.REGIONS)) as pool:
+        payloads = [p for p in pool.map(fetch, CONFIG.REGIONS) if p is not None]
+
+    if not payloads:
+        raise RuntimeError(f"Odds API request failed for all regions: {','.join(CONFIG.REGIONS)}")
+    return payloads
+
+
+def get_event_odds_multi_book(sport_key: str, event_id: str, markets: str, priority: str = "scan"):
+    payloads = get_event_odds_raw(sport_key, event_id, markets, priority)
+    return merge_region_payloads([json.loads(p) for p in payloads])
@@ -0,0 +1,90 @@
+import queue
+import threading
+import traceback
+from typing import Iterator, NamedTuple
+
+from odds_provider import get_event_odds_raw
+from scan import ScanResult, scan_payload
+
+
+class ScanJob(NamedTuple):
+    sport: str
+    event_id: str
+    event: str
+    markets: str
+
+
+def run_pipeline(jobs: list[ScanJob], fetch_workers: int, cpu_workers: int,
+                 max_inflight: int) -> Iterator[tuple[ScanJob, ScanResult | None]]:
+    """
+    Fetch → parse/score → aggregate, overlapped.
+
+    Fetcher threads pull raw odds bodies; parsing and scoring run inline in the
+    fetcher thread, or in a process pool when `cpu_workers` > 0 (bytes go in,
+    compact ScanResult rows come back). The caller consumes results as they
+    finish and is the single aggregator. At most `max_inflight` events are
+    fetched-but-not-yet-consumed at any time, so memory stays bounded no matter
+    how many events are queued. Yields (job, None) when an event failed.
+    """
+    if not jobs:
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    results = queue.Queue()
+    slots = threading.BoundedSemaphore(max_inflight)
+
+    cpu = None
+    if cpu_workers > 0:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # spawn: the parent already runs threads, which fork does not play well with
+        cpu = ProcessPoolExecutor(cpu_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def scanned(job, fut):
+        try:
+            results.put((job, fut.result()))
+        except Exception:
+            traceback.print_exc()
+            results.put((job, None))
+
+    def stage(job):
+        try:
+            raw = get_event_odds_raw(job.sport, job.event_id, job.markets)
+        except Exception:
+            results.put((job, None))
+            return
+
+        if cpu is not None:
+            try:
+                cpu.submit(scan_payload, raw).add_done_callback(lambda fut: scanned(job, fut))
+            except Exception:
+                # e.g. BrokenProcessPool after a worker died; the aggregator still expects a result
+                traceback.print_exc()
+                results.put((job, None))
+            return
+        try:
+            results.put((job, scan_payload(raw)))
+        except Exception:
+            traceback.print_exc()
+            results.put((job, None))
+
+    fetchers = ThreadPoolExecutor(max_workers=fetch_workers)
+
+    def feed():
+        # backpressure: a slot is held from fetch start until the aggregator takes the result
+        for job in jobs:
+            slots.acquire()
+            fetchers.submit(stage, job)
+
+    threading.Thread(target=feed, name="scan-feeder", daemon=True).start()
+
+    try:
+        for _ in range(len(jobs)):
+            item = results.get()
+            slots.release()
+            yield item
+    finally:
+        fetchers.shutdown(wait=False, cancel_futures=True)
+        if cpu is not None:
+            cpu.shutdown(wait=False, cancel_futures=True)
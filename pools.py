@@ -0,0 +1,72 @@
+import heapq
+import itertools
+
+from models import Candidate
+
+
+class TopKPool:
+    """
+    Bounded pool that keeps only the best `k` candidates of a tier as they stream in.
+
+    Candidates are pushed with a precomputed score; a min-heap holds the current
+    top k so the worst kept entry is evicted in O(log k). Among equal scores
+    the earliest arrival is kept, as a stable best-first sort would. With `one_per_event`
+    the pool holds at most one candidate per event (its best), so the
+    one-pick-per-game rule is already applied when the scan finishes.
+    Memory stays O(k) regardless of slate size.
+    """
+
+    def __init__(self, k: int, one_per_event: bool):
+        self.k = k
+        self.one_per_event = one_per_event
+        self._heap = []      # [score, -seq, slot_key, cand, alive]; ties pop the latest arrival first
+        self._by_slot = {}   # slot_key -> live heap entry
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._by_slot)
+
+    def _slot(self, cand: Candidate):
+        return cand.event if self.one_per_event else next(self._seq)
+
+    def _drop_dead(self) -> None:
+        while self._heap and not self._heap[0][4]:
+            heapq.heappop(self._heap)
+
+    def push(self, cand: Candidate, score: float) -> bool:
+        """Offer a candidate; returns True if it was kept."""
+        if self.k <= 0:
+            return False
+
+        slot = self._slot(cand)
+        prev = self._by_slot.get(slot)
+        if prev is not None:
+            if score <= prev[0]:
+                return False
+            prev[4] = False
+            del self._by_slot[slot]
+        elif len(self._by_slot) >= self.k:
+            self._drop_dead()
+            if score <= self._heap[0][0]:
+                return False
+
+        entry = [score, -next(self._seq), slot, cand, True]
+        heapq.heappush(self._heap, entry)
+        self._by_slot[slot] = entry
+
+        if len(self._by_slot) > self.k:
+            self._drop_dead()
+            worst = heapq.heappop(self._heap)
+            del self._by_slot[worst[2]]
+
+        # replaced entries linger as dead heap nodes; compact before they add up
+        if len(self._heap) > 2 * self.k + 8:
+            self._heap = [e for e in self._heap if e[4]]
+            heapq.heapify(self._heap)
+        return True
+
+    def ranked(self) -> list[Candidate]:
+        """Kept candidates, best first (ties keep arrival order)."""
+        live = [e for e in self._heap if e[4]]
+        live.sort(key=lambda e: (-e[0], -e[1]))
+        return [e[3] for e in live]
@@ -26,11 +26,33 @@ def kelly_fraction(p: float, odds: int) -> float:
     f = (b * p - q) / b
     return max(0.0, f)
 
-def consensus_probability_from_probs(probs: list[float]) -> float | None:
-    vals = [p for p in probs if isinstance(p, float) and 0.001 < p < 0.999]
-    if not vals:
+def weighted_median(values: list[float], weights: list[float]) -> float:
+    """
+    Weighted median; with equal weights this matches statistics.median
+    (the two middle values are averaged when the halves balance exactly).
+    """
+    pairs = sorted(zip(values, weights))
+    half = sum(w for _, w in pairs) / 2.0
+    cum = 0.0
+    for i, (v, w) in enumerate(pairs):
+        cum += w
+        if cum > half:
+            return v
+        if cum == half and i + 1 < len(pairs):
+            return (v + pairs[i + 1][0]) / 2.0
+    return pairs[-1][0]
+
+def consensus_probability_from_probs(probs: list[float], weights: list[float] | None = None) -> float | None:
+    if weights is None:
+        vals = [p for p in probs if isinstance(p, float) and 0.001 < p < 0.999]
+        if not vals:
+            return None
+        return float(median(vals))
+
+    kept = [(p, w) for p, w in zip(probs, weights) if isinstance(p, float) and 0.001 < p < 0.999 and w > 0]
+    if not kept:
         return None
-    return float(median(vals))
+    return float(weighted_median([p for p, _ in kept], [w for _, w in kept]))
 
 def fair_prob_two_way_no_vig(p_a: float, p_b: float) -> float:
     s = p_a + p_b
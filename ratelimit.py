@@ -0,0 +1,164 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# lower number = served first; "scan" leaves RATE_LIMIT_RESERVE tokens in the bucket for the rest
+PRIORITIES = {"verify": 0, "closing": 0, "scan": 1}
+
+
+class SharedRateLimiter:
+    """
+    Token bucket + credit ledger shared by every bot process using the same Odds API key.
+
+    State lives in a local SQLite file; each acquire is one short
+    BEGIN IMMEDIATE transaction, so concurrent instances serialize on the
+    file lock instead of racing into 429s. Discovery scans ("scan") may
+    only take a token while more than `reserve` remain, which keeps
+    headroom for verify and closing-line fetches. Credits reported by the
+    API (x-requests-remaining / x-requests-used / x-requests-last) are
+    recorded per key; once remaining credits fall below `credit_floor`,
+    only high-priority calls are let through. The per-call ledger keeps
+    `ledger_days` of history.
+    """
+
+    def __init__(self, path: str, api_key: str, rate_per_sec: float, burst: int, reserve: int, credit_floor: int,
+                 ledger_days: float = 7):
+        self.path = path
+        # never store the key itself
+        self.key = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+        self.rate = rate_per_sec
+        self.burst = burst
+        self.reserve = reserve
+        self.credit_floor = credit_floor
+        self.ledger_days = ledger_days
+        self.instance = f"{os.getpid()}"
+        self._local = threading.local()
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS bucket (
+                key TEXT PRIMARY KEY,
+                tokens REAL,
+                updated REAL,
+                blocked_until REAL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS credits (
+                key TEXT PRIMARY KEY,
+                remaining INTEGER,
+                used INTEGER,
+                updated REAL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ledger (
+                ts REAL,
+                key TEXT,
+                instance TEXT,
+                priority TEXT,
+                status INTEGER,
+                cost INTEGER,
+                remaining INTEGER
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ledger_ts ON ledger (ts)")
+
+    def acquire(self, priority: str = "scan", timeout: float = 120.0) -> None:
+        """Block until a token is available for this priority; RuntimeError on timeout or credit floor."""
+        level = PRIORITIES.get(priority, 1)
+        keep = 0 if level == 0 else self.reserve
+        deadline = time.monotonic() + timeout
+        conn = self._conn()
+
+        while True:
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated, blocked_until FROM bucket WHERE key = ?", (self.key,)
+                ).fetchone()
+                tokens, updated, blocked_until = row if row else (float(self.burst), now, 0.0)
+                tokens = min(float(self.burst), tokens + max(0.0, now - updated) * self.rate)
+
+                if level > 0 and self.credit_floor > 0:
+                    c = conn.execute("SELECT remaining FROM credits WHERE key = ?", (self.key,)).fetchone()
+                    if c and c[0] is not None and c[0] < self.credit_floor:
+                        raise RuntimeError(
+                            f"Odds API credits below floor ({c[0]} < {self.credit_floor}); skipping {priority} call"
+                        )
+
+                wait = 0.0
+                if blocked_until > now:
+                    wait = blocked_until - now
+                elif tokens - 1.0 < keep:
+                    wait = (1.0 + keep - tokens) / self.rate
+                else:
+                    tokens -= 1.0
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO bucket (key, tokens, updated, blocked_until) VALUES (?, ?, ?, ?)",
+                    (self.key, tokens, now, blocked_until),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            if wait <= 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RuntimeError(f"Rate limiter timed out waiting for a {priority} token")
+            # re-check soon: other instances may refill or drain the bucket meanwhile
+            time.sleep(min(wait, 0.5))
+
+    def record(self, priority: str, status: int, headers) -> None:
+        """Book the response: credit headers into the ledger (pruning old rows), and a shared pause on 429."""
+        now = time.time()
+        remaining = _int_header(headers, "x-requests-remaining")
+        used = _int_header(headers, "x-requests-used")
+        cost = _int_header(headers, "x-requests-last")
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if remaining is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO credits (key, remaining, used, updated) VALUES (?, ?, ?, ?)",
+                    (self.key, remaining, used, now),
+                )
+            conn.execute(
+                "INSERT INTO ledger (ts, key, instance, priority, status, cost, remaining) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (now, self.key, self.instance, priority, status, cost, remaining),
+            )
+            conn.execute("DELETE FROM ledger WHERE ts < ?", (now - self.ledger_days * 86400,))
+            if status == 429:
+                pause = _int_header(headers, "retry-after") or 2
+                conn.execute(
+                    "UPDATE bucket SET blocked_until = MAX(COALESCE(blocked_until, 0), ?), tokens = 0, updated = ? WHERE key = ?",
+                    (now + pause, now, self.key),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def _int_header(headers, name: str):
+    try:
+        v = headers.get(name)
+        return None if v is None else int(float(v))
+    except (TypeError, ValueError):
+        return None
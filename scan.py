@@ -0,0 +1,265 @@
+import json
+import time
+from typing import NamedTuple
+
+from config import CONFIG
+from curves import base_market, build_line_curves, curve_prob
+from gates import event_gate, outcome_gates, run_gates
+from odds_provider import merge_region_payloads
+from probability import (
+    implied_prob_american,
+    expected_value,
+    consensus_probability_from_probs,
+    fair_prob_two_way_no_vig,
+)
+from stale import detect_stale_quotes
+from timeutil import parse_iso_epoch
+
+# built once per process from the frozen config
+OUTCOME_GATES = outcome_gates(CONFIG.STRICT_MARKETS, CONFIG.TARGET_BOOKS)
+
+
+def within_tol(a, b, tol: float) -> bool:
+    if a is None or b is None:
+        return False
+    return abs(float(a) - float(b)) <= tol
+
+
+# ---------- odds indexing ----------
+
+def book_weights(bookmakers: list[dict]) -> dict:
+    """
+    Consensus weight per book for one snapshot: the configured sharp/soft weight,
+    halved for every STALE_HALF_LIFE_MINUTES the book lags the freshest book.
+    """
+    stamps = {}
+    for bm in bookmakers:
+        book = (bm.get("key") or "").lower()
+        try:
+            stamps[book] = parse_iso_epoch(bm["last_update"])
+        except Exception:
+            stamps[book] = None
+
+    known = [ts for ts in stamps.values() if ts is not None]
+    newest = max(known) if known else None
+    half_life = CONFIG.STALE_HALF_LIFE_MINUTES * 60.0
+
+    weights = {}
+    for book, ts in stamps.items():
+        w = CONFIG.BOOK_WEIGHTS.get(book, 1.0)
+        if ts is not None and newest is not None and half_life > 0:
+            w *= 0.5 ** ((newest - ts) / half_life)
+        weights[book] = (w, ts)
+    return weights
+
+
+def normalize_event_index(odds_data: dict) -> dict:
+    """
+    Index outcomes by (market, participant, side) -> list of dict(book,line,price,w,ts,fair_prob_in_book?).
+    Adds no-vig fair probs for two-way Over/Under markets when possible.
+    `w` is the book's consensus weight, `ts` its last_update as UTC epoch seconds.
+    Alternate-line markets ("<market>_alternate") are folded into their base market.
+    """
+    idx = {}
+    bookmakers = odds_data.get("bookmakers", [])
+    weights = book_weights(bookmakers)
+
+    for bm in bookmakers:
+        book = (bm.get("key") or "").lower()
+        w, ts = weights[book]
+
+        for m in bm.get("markets", []):
+            market = m.get("key")
+            if market:
+                market = base_market(market)
+            outcomes = m.get("outcomes", [])
+
+            # capture OU pairs per (participant,line)
+            ou_pairs = {}
+
+            for o in outcomes:
+                participant = o.get("description") or o.get("name")
+                side = o.get("name")
+                line = o.get("point")
+                price = o.get("price")
+
+                if not participant or not market or not side or not isinstance(price, int):
+                    continue
+
+                idx.setdefault((market, participant, side), []).append(
+                    {"book": book, "line": line, "price": price, "w": w, "ts": ts}
+                )
+
+                if side in ("Over", "Under") and line is not None:
+                    ou_pairs.setdefault((participant, float(line)), {})[side] = price
+
+            # compute no-vig fair probabilities for OU pairs in this bookmaker
+            for (participant, line), sides in ou_pairs.items():
+                if "Over" in sides and "Under" in sides:
+                    po = implied_prob_american(sides["Over"])
+                    pu = implied_prob_american(sides["Under"])
+                    fo = fair_prob_two_way_no_vig(po, pu)
+                    for side in ("Over", "Under"):
+                        key = (market, participant, side)
+                        for e in idx.get(key, []):
+                            if e["book"] == book and e.get("line") is not None and float(e["line"]) == float(line):
+                                e["fair_prob_in_book"] = fo if side == "Over" else (1 - fo)
+
+    return idx
+
+
+def consensus_prob(idx: dict, market: str, participant: str, side: str, target_line, tol: float,
+                   curves: dict | None = None):
+    """
+    Return consensus fair probability (no-vig when available) and count of contributing books.
+    Over/Under lines are priced off the (market, participant) line curve when one
+    is available, and only inside its quoted range; otherwise books within `tol`
+    of the line are combined by weighted median using their per-snapshot weights.
+    """
+    if curves and target_line is not None and side in ("Over", "Under"):
+        curve = curves.get((market, participant))
+        if curve is not None:
+            # outside the fitted range there is nothing honest to price against
+            point = curve_prob(curve, side, float(target_line), tol)
+            if point is None or not 0.001 < point[0] < 0.999:
+                return None, 0
+            return point
+
+    entries = idx.get((market, participant, side), [])
+    probs = []
+    weights = []
+
+    for e in entries:
+        line = e.get("line")
+        if target_line is None:
+            if line is not None:
+                continue
+        else:
+            if line is None or not within_tol(line, target_line, tol):
+                continue
+
+        if "fair_prob_in_book" in e:
+            probs.append(float(e["fair_prob_in_book"]))
+        else:
+            probs.append(implied_prob_american(int(e["price"])))
+        weights.append(e.get("w", 1.0))
+
+    if not probs:
+        return None, 0
+
+    return consensus_probability_from_probs(probs, weights), len(probs)
+
+
+# ---------- per-event scan (runs in pipeline workers) ----------
+
+class ScanResult(NamedTuple):
+    """
+    Compact result of scanning one event snapshot.
+    `rows` are (market, player, side, line, p_model, books_count, book, odds, ev)
+    tuples in Candidate field order, so the aggregator can rebuild records
+    without shipping dict trees between processes. `quotes` is only filled
+    when exporting or serving the board: (market, player, side, line, book,
+    price, fair_prob, weight, ts); `consensus` only for the board:
+    (market, player, side, line, p, books) per quoted line.
+    """
+    rows: list
+    stale: list
+    blocked: dict
+    quotes: list = []
+    consensus: list = []
+
+
+def evaluate_event(idx: dict, use_curves: bool = False) -> tuple[list, dict]:
+    """Best target-book execution per (market, participant, side), with its consensus and EV."""
+    rows = []
+    blocked = {"tier": 0}
+
+    # cheap structural gates on the whole batch before any consensus/EV work
+    batch = run_gates(list(idx.items()), OUTCOME_GATES, blocked)
+
+    # line curves only for the players/markets that survived the gates
+    curves = None
+    if use_curves:
+        curves = build_line_curves(idx, {(market, participant) for (market, participant, _), _ in batch})
+
+    # evaluate each (market, player, side) and find best target book among TARGET_BOOKS
+    for (market, participant, side), entries in batch:
+        best_exec = None
+
+        for e in entries:
+            if e["book"] not in CONFIG.TARGET_BOOKS:
+                continue
+
+            odds_val = int(e["price"])
+            line = e.get("line")
+
+            p_model, books_count = consensus_prob(idx, market, participant, side, line, CONFIG.LINE_TOLERANCE, curves)
+            if p_model is None:
+                continue
+
+            ev_val = expected_value(p_model, odds_val)
+
+            if best_exec is None or ev_val > best_exec[0]:
+                best_exec = (ev_val, e["book"], odds_val, line, p_model, books_count)
+
+        if not best_exec:
+            continue
+
+        ev_val, book, odds_val, line, p_model, books_count = best_exec
+        edge = p_model - implied_prob_american(odds_val)
+
+        # sanity cap to avoid “too good to be true”
+        if edge > CONFIG.MAX_EDGE_CAP:
+            blocked["tier"] += 1
+            continue
+
+        rows.append((
+            market, participant, side,
+            None if line is None else float(line),
+            float(p_model), int(books_count), book, int(odds_val), float(ev_val),
+        ))
+
+    return rows, blocked
+
+
+def scan_payload(raw_payloads: list[bytes]) -> ScanResult:
+    """Parse raw per-region odds bodies for one event and score every outcome."""
+    odds = merge_region_payloads([json.loads(p) for p in raw_payloads])
+
+    try:
+        commence = parse_iso_epoch(odds["commence_time"])
+    except (KeyError, TypeError, ValueError):
+        commence = None
+    if not event_gate(commence, time.time() + CONFIG.PREGAME_BUFFER_MINUTES * 60).ok:
+        return ScanResult([], [], {"window": 1})
+
+    idx = normalize_event_index(odds)
+    rows, blocked = evaluate_event(idx, CONFIG.ENABLE_LINE_CURVES)
+
+    stale = []
+    if CONFIG.ENABLE_STALE_ALERTS:
+        stale = detect_stale_quotes(
+            idx, CONFIG.TARGET_BOOKS, CONFIG.STALE_MIN_DELTA, CONFIG.STALE_MIN_LAG_SECONDS, CONFIG.STALE_MIN_BOOKS,
+            CONFIG.LINE_TOLERANCE if CONFIG.ENABLE_LINE_CURVES else None,
+        )[:CONFIG.STALE_MAX_ALERTS]
+
+    quotes = []
+    if CONFIG.EXPORT_DIR or CONFIG.BOARD_API_PORT:
+        quotes = [
+            (market, participant, side, e.get("line"), e["book"], e["price"],
+             e.get("fair_prob_in_book"), e.get("w"), e.get("ts"))
+            for (market, participant, side), entries in idx.items()
+            for e in entries
+        ]
+
+    consensus = []
+    if CONFIG.BOARD_API_PORT:
+        # the board shows every quoted outcome, gated or not
+        curves = build_line_curves(idx) if CONFIG.ENABLE_LINE_CURVES else None
+        for (market, participant, side), entries in idx.items():
+            for line in dict.fromkeys(e.get("line") for e in entries):
+                p, books = consensus_prob(idx, market, participant, side, line, CONFIG.LINE_TOLERANCE, curves)
+                if p is not None:
+                    consensus.append((market, participant, side, line, p, books))
+
+    return ScanResult(rows, stale, blocked, quotes, consensus)
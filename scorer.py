@@ -1,26 +1,23 @@
+import heapq
+import itertools
 from typing import List, Dict, Optional
-from probability import parlay_ev, parlay_decimal_odds
-
-def score_pick(p: Dict) -> float:
-    ev = p.get("ev")
-    books = p.get("books_count", 0)
-    odds = p.get("target_odds")
-
-    if not isinstance(ev, float) or not isinstance(books, int):
-        return -999.0
+from curves import base_market
+from models import Candidate
+from probability import american_to_decimal, parlay_ev, parlay_decimal_odds
 
+def score_pick(p: Candidate) -> float:
     # EV dominates; books boosts confidence; small bonus for plus money
-    score = ev * 100.0 + min(books, 10) * 0.5
-    if isinstance(odds, int) and odds > 0:
+    score = p.ev * 100.0 + min(p.books_count, 10) * 0.5
+    if p.target_odds > 0:
         score += 0.2
     return score
 
-def select_top(picks: List[Dict], n: int) -> List[Dict]:
+def select_top(picks: List[Candidate], n: int) -> List[Candidate]:
     return sorted(picks, key=score_pick, reverse=True)[:n]
 
-def _parlay_package(legs: List[Dict]) -> Dict:
-    odds_list = [leg["target_odds"] for leg in legs]
-    p_list = [leg["p_model"] for leg in legs]
+def _parlay_package(legs: List[Candidate]) -> Dict:
+    odds_list = [leg.target_odds for leg in legs]
+    p_list = [leg.p_model for leg in legs]
     dec = parlay_decimal_odds(odds_list)
     ev = parlay_ev(p_list, odds_list)
     p_parlay = 1.0
@@ -28,50 +25,135 @@ def _parlay_package(legs: List[Dict]) -> Dict:
         p_parlay *= p
     return {"legs": legs, "dec_odds": dec, "ev": ev, "p_parlay": p_parlay}
 
-def build_best_builder(top_singles: List[Dict]) -> Optional[Dict]:
+def build_best_builder(top_singles: List[Candidate]) -> Optional[Dict]:
     # 2-leg cross-game, both legs are singles-quality
     for i in range(len(top_singles)):
         for j in range(i + 1, len(top_singles)):
             a, b = top_singles[i], top_singles[j]
-            if a.get("event") != b.get("event"):
+            if a.event != b.event:
                 return _parlay_package([a, b])
     return None
 
-def _sgp_ok_pair(a: Dict, b: Dict) -> bool:
-    # Controlled SGP anti-correlation heuristics
-    if a.get("event") != b.get("event"):
-        return False
-    if a.get("player") == b.get("player"):
-        return False
-    if a.get("market") == b.get("market"):
-        return False
-    if a.get("market") == "player_anytime_td" and b.get("market") == "player_anytime_td":
-        return False
-    return True
-
-def build_controlled_sgp(approved: List[Dict], top_singles: List[Dict], sgp_decimal_cap: float) -> Optional[Dict]:
-    # 2-leg same-game; at least one leg must be a top single; payout capped
+class SGPIndex:
+    """
+    Same-game parlay index: each event's legs are sorted once, then bucketed by
+    player (each bucket ordered by decimal odds). Combos are only ever drawn
+    from distinct player buckets and distinct market families, so disallowed
+    pairs are never enumerated, and a bucket walk stops as soon as the running
+    decimal passes the cap.
+    """
+
+    def __init__(self, approved: List[Candidate]):
+        by_event: dict[str, List[Candidate]] = {}
+        for p in approved:
+            by_event.setdefault(p.event, []).append(p)
+
+        self.legs: dict[str, List[Candidate]] = {}
+        self._buckets: dict[str, list] = {}
+        for event, legs in by_event.items():
+            legs.sort(key=score_pick, reverse=True)
+            self.legs[event] = legs
+
+            players: dict[str, list] = {}
+            for leg in legs:
+                players.setdefault(leg.player, []).append(
+                    (american_to_decimal(leg.target_odds), base_market(leg.market), leg)
+                )
+            buckets = list(players.values())
+            for b in buckets:
+                b.sort(key=lambda t: t[0])
+            self._buckets[event] = buckets
+
+    def top_combos(self, event: str, n_legs: int, decimal_cap: float, k: int,
+                   anchors: Optional[List[Candidate]] = None) -> List[Dict]:
+        """
+        Top-k valid n-leg combos for `event` under the cap, ranked by EV (independence approx).
+        With `anchors`, every combo starts from one of this event's anchors (which
+        need not be in `approved`) and the rest is drawn from the other players'
+        buckets, outside the anchor's market family.
+        """
+        buckets = self._buckets.get(event, [])
+        if k <= 0:
+            return []
+
+        heap: list = []
+        seq = itertools.count()
+        seen: set = set()
+        chosen: list = []
+
+        def offer():
+            legs = [leg for _, _, leg in chosen]
+            # anchors may equal approved legs, so one set can be reached from two anchors
+            ident = frozenset((l.market, l.player, l.side, l.line, l.target_book_used, l.target_odds) for l in legs)
+            if ident in seen:
+                return
+            seen.add(ident)
+            ev = parlay_ev([leg.p_model for leg in legs], [leg.target_odds for leg in legs])
+            item = (ev, next(seq), legs)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif ev > heap[0][0]:
+                heapq.heapreplace(heap, item)
+
+        def walk(start: int, dec: float, families: set, skip_player):
+            if len(chosen) == n_legs:
+                offer()
+                return
+            for bi in range(start, len(buckets) - (n_legs - len(chosen)) + 1):
+                if buckets[bi][0][2].player == skip_player:
+                    continue
+                for d, fam, leg in buckets[bi]:
+                    if dec * d > decimal_cap:
+                        break
+                    if fam in families:
+                        continue
+                    chosen.append((d, fam, leg))
+                    families.add(fam)
+                    walk(bi + 1, dec * d, families, skip_player)
+                    families.discard(fam)
+                    chosen.pop()
+
+        if anchors is None:
+            if len(buckets) >= n_legs:
+                walk(0, 1.0, set(), None)
+        else:
+            for a in anchors:
+                if a.event != event:
+                    continue
+                d = american_to_decimal(a.target_odds)
+                if d > decimal_cap:
+                    continue
+                fam = base_market(a.market)
+                chosen.append((d, fam, a))
+                walk(0, d, {fam}, a.player)
+                chosen.pop()
+
+        return [_parlay_package(legs) for _, _, legs in sorted(heap, key=lambda t: (-t[0], t[1]))]
+
+def build_top_sgps(approved: List[Candidate], sgp_decimal_cap: float, k: int, n_legs: int = 2) -> List[Dict]:
+    """Best k same-game parlays across all events (pairs by default, triples with n_legs=3), by EV."""
+    index = SGPIndex(approved)
+    out = []
+    for event in index.legs:
+        out += index.top_combos(event, n_legs, sgp_decimal_cap, k)
+    out.sort(key=lambda pkg: pkg["ev"], reverse=True)
+    return out[:k]
+
+def build_controlled_sgp(approved: List[Candidate], top_singles: List[Candidate], sgp_decimal_cap: float) -> Optional[Dict]:
+    # 2-leg same-game; at least one leg must be a top single; payout capped; best EV wins
     if not top_singles:
         return None
 
-    by_event: dict[str, List[Dict]] = {}
-    for p in approved:
-        by_event.setdefault(p.get("event", ""), []).append(p)
-
-    for anchor in top_singles:
-        pool = sorted(by_event.get(anchor.get("event", ""), []), key=score_pick, reverse=True)
-        for b in pool:
-            if b is anchor:
-                continue
-            if not _sgp_ok_pair(anchor, b):
-                continue
-            pkg = _parlay_package([anchor, b])
-            if pkg["dec_odds"] <= sgp_decimal_cap:
-                return pkg
+    index = SGPIndex(approved)
+    best = None
+    for event in {a.event for a in top_singles}:
+        top = index.top_combos(event, 2, sgp_decimal_cap, 1, anchors=top_singles)
+        if top and (best is None or top[0]["ev"] > best["ev"]):
+            best = top[0]
 
-    return None
+    return best
 
-def build_lottery(approved: List[Dict], lottery_decimal_cap: float) -> Optional[Dict]:
+def build_lottery(approved: List[Candidate], lottery_decimal_cap: float) -> Optional[Dict]:
     # 3-leg cross-game preferred; payout capped
     ranked = sorted(approved, key=score_pick, reverse=True)
 
@@ -79,7 +161,7 @@ def build_lottery(approved: List[Dict], lottery_decimal_cap: float) -> Optional[
         for j in range(i + 1, len(ranked)):
             for k in range(j + 1, len(ranked)):
                 a, b, c = ranked[i], ranked[j], ranked[k]
-                if len({a.get("event"), b.get("event"), c.get("event")}) < 3:
+                if len({a.event, b.event, c.event}) < 3:
                     continue
                 pkg = _parlay_package([a, b, c])
                 if pkg["dec_odds"] <= lottery_decimal_cap:
@@ -0,0 +1,290 @@
+from itertools import compress
+from math import log
+from operator import add, and_, mul, sub, truediv
+
+from models import Candidate
+from probability import parlay_decimal_odds
+
+
+def _leg_key(c: Candidate) -> tuple:
+    # the same outcome at another book/price is still the same leg
+    return (c.event_id, c.market, c.player, c.side, c.line)
+
+
+def _legs(bets: list[list[Candidate]]) -> tuple[dict, list[frozenset]]:
+    """Unique legs {key: p} and each bet's set of leg keys (first quote's p wins)."""
+    probs = {}
+    sets = []
+    for bet_legs in bets:
+        keys = set()
+        for c in bet_legs:
+            k = _leg_key(c)
+            probs.setdefault(k, c.p_model)
+            keys.add(k)
+        sets.append(frozenset(keys))
+    return probs, sets
+
+
+def outcome_distribution(bets: list[list[Candidate]]) -> dict[int, float]:
+    """
+    Exact joint win/lose distribution of `bets` as {win_mask: probability},
+    bit b set when bet b wins. Legs are independent (as in parlay_ev), but a
+    leg shared by several bets is one coin flip for all of them. Legs are
+    folded in one at a time and a lost leg clears every bet holding it, so the
+    state space is bounded by 2^bets no matter how many legs there are.
+    """
+    probs, sets = _legs(bets)
+    masks = {k: 0 for k in probs}
+    for b, keys in enumerate(sets):
+        for k in keys:
+            masks[k] |= 1 << b
+
+    dist = {(1 << len(bets)) - 1: 1.0}
+    for k, p in probs.items():
+        mask = masks[k]
+        nxt = {}
+        for state, q in dist.items():
+            nxt[state] = nxt.get(state, 0.0) + q * p
+            lost = state & ~mask
+            nxt[lost] = nxt.get(lost, 0.0) + q * (1.0 - p)
+        dist = nxt
+    return dist
+
+
+def pair_model(bets: list[list[Candidate]], decs: list[float]) -> tuple[list[float], list[list[float]]]:
+    """
+    Each bet's win probability P(b) and the exact cross moments of the per-$1
+    returns r_b (d_b − 1 on a win, −1 on a loss):
+    E[r_b·r_c] = d_b·d_c·P(b and c) − d_b·P(b) − d_c·P(c) + 1, where P(b and c)
+    is the product over the union of both bets' legs (diagonal left at 0).
+    """
+    probs, sets = _legs(bets)
+
+    def p_all(keys):
+        out = 1.0
+        for k in keys:
+            out *= probs[k]
+        return out
+
+    p_win = [p_all(s) for s in sets]
+    n = len(bets)
+    cross = [[0.0] * n for _ in range(n)]
+    for b in range(n):
+        for c in range(b + 1, n):
+            v = decs[b] * decs[c] * p_all(sets[b] | sets[c]) - decs[b] * p_win[b] - decs[c] * p_win[c] + 1.0
+            cross[b][c] = cross[c][b] = v
+    return p_win, cross
+
+
+def _solve_pairs(decs: list[float], p_win: list[float], cross: list[list[float]], upper: float, lam: float,
+                 f: list[float], tol: float = 1e-10, max_sweeps: int = 500) -> None:
+    """
+    Coordinate ascent on Σ_b E[log(1 + f_b·r_b)] − Σ_{b<c} f_b·f_c·E[r_b·r_c] − lam·Σf
+    with 0 <= f_b <= upper: every bet's own growth is exact and only the
+    interactions are taken to second order (log(1 + Σx) ≈ Σ log(1 + x) − Σ x_b·x_c).
+    `f` is updated in place.
+    """
+    for _ in range(max_sweeps):
+        moved = 0.0
+        for b, (d, p, row) in enumerate(zip(decs, p_win, cross)):
+            k = lam + sum(map(mul, row, f))
+            x = f[b]
+            for _ in range(50):
+                win = 1.0 + x * (d - 1.0)
+                g = p * (d - 1.0) / win - (1.0 - p) / (1.0 - x) - k
+                h = p * (d - 1.0) ** 2 / win ** 2 + (1.0 - p) / (1.0 - x) ** 2
+                # the objective is concave in x, so Newton from either side lands in a few steps
+                nxt = min(max(x + g / h, 0.0), upper, 1.0 - 1e-6)
+                if abs(nxt - x) < 1e-13:
+                    break
+                x = nxt
+            moved = max(moved, abs(x - f[b]))
+            f[b] = x
+        if moved < tol:
+            return
+
+
+def _solve_quadratic(mu: list[float], m2: list[list[float]], upper: float, lam: float,
+                     f: list[float], tol: float = 1e-10, max_sweeps: int = 500) -> None:
+    """
+    Coordinate ascent on the concave quadratic μ·f − ½·fᵀ·M·f − lam·Σf with
+    0 <= f_b <= upper; `f` is updated in place.
+    """
+    for _ in range(max_sweeps):
+        moved = 0.0
+        for b, row in enumerate(m2):
+            if row[b] <= 0.0:
+                continue
+            g = mu[b] - lam - sum(map(mul, row, f)) + row[b] * f[b]
+            new = min(max(g / row[b], 0.0), upper)
+            moved = max(moved, abs(new - f[b]))
+            f[b] = new
+        if moved < tol:
+            return
+
+
+def _solve_exact(decs: list[float], returns: list[list[float]], wins: list[list[int]], both: dict, probs: list[float],
+                 upper: float, lam: float, f: list[float], wealth: list[float], tol: float = 1e-8,
+                 max_iters: int = 50) -> None:
+    """
+    Projected Newton on Σ_s p_s·log(W_s) − lam·Σ_b f_b with 0 <= f_b <= upper:
+    each iteration takes the exact gradient and Hessian over the states and
+    steps to the optimum of that quadratic with _solve_quadratic, halving the
+    step if it does not improve. `f` and `wealth` are updated in place (warm
+    start for the next call). Per state: `returns[b]` is bet b's return, `wins[b]`
+    marks where it wins and `both[b, c]` where b and c both win.
+    """
+    n = len(decs)
+
+    def growth(w, x):
+        return sum(map(mul, probs, map(log, w))) - lam * sum(x)
+
+    current = growth(wealth, f)
+    for _ in range(max_iters):
+        a = list(map(truediv, probs, wealth))
+        a2 = list(map(truediv, a, wealth))
+        a_sum = sum(a)
+        a2_sum = sum(a2)
+        won = [sum(compress(a, w)) for w in wins]
+        won2 = [sum(compress(a2, w)) for w in wins]
+
+        grad = [d * wb - a_sum for d, wb in zip(decs, won)]
+        hess = [[0.0] * n for _ in range(n)]
+        for b in range(n):
+            db = decs[b] - 1.0
+            hess[b][b] = db * db * won2[b] + (a2_sum - won2[b])
+            for c in range(b + 1, n):
+                dc = decs[c] - 1.0
+                ww = sum(compress(a2, both[b, c]))
+                v = db * dc * ww - db * (won2[b] - ww) - dc * (won2[c] - ww) + (a2_sum - won2[b] - won2[c] + ww)
+                hess[b][c] = hess[c][b] = v
+
+        # the local model in terms of the new stakes x = f + δ
+        lin = [g + sum(map(mul, row, f)) for g, row in zip(grad, hess)]
+        x = list(f)
+        _solve_quadratic(lin, hess, upper, lam, x)
+        delta = list(map(sub, x, f))
+        # r >= -1 everywhere, so W_s >= 1 - Σf: keeping Σf < 1 keeps every wealth positive
+        room = 1.0 - 1e-6 - sum(f)
+        grow = sum(delta)
+        if grow > room:
+            delta = [dx * room / grow for dx in delta]
+
+        t = 1.0
+        while True:
+            w_new = list(wealth)
+            for dx, r in zip(delta, returns):
+                if dx:
+                    w_new[:] = map(add, w_new, map((t * dx).__mul__, r))
+            f_new = [fb + t * dx for fb, dx in zip(f, delta)]
+            if min(w_new) > 0.0:
+                value = growth(w_new, f_new)
+                if value >= current - 1e-15:
+                    break
+            t /= 2.0
+            if t < 1e-6:
+                return
+
+        f[:] = f_new
+        wealth[:] = w_new
+        current = value
+        if max(map(abs, delta)) * t < tol:
+            return
+
+
+def _fit_budget(solve, f: list[float], budget: float, lam_hi: float, lam: float) -> float:
+    """
+    Find the budget price lam >= 0 at which solve(lam) spends at most `budget`,
+    starting from the guess `lam`; returns it (0.0 when the cap does not bind).
+    Regula falsi on Σf(lam), which falls monotonically, with a bisection guard.
+    """
+    lo, t_lo = 0.0, None     # Σf at lo is > budget once known
+    hi, t_hi = lam_hi, 0.0   # nothing is worth staking at lam_hi
+    for _ in range(60):
+        solve(lam)
+        total = sum(f)
+        if lam == 0.0 and total <= budget:
+            return 0.0
+        if budget * 0.999 <= total <= budget:
+            return lam
+        if total > budget:
+            lo, t_lo = lam, total
+        else:
+            hi, t_hi = lam, total
+
+        if t_lo is None:
+            # not yet known that the cap binds at all
+            lam = 0.0
+            continue
+        lam = lo + (t_lo - budget) * (hi - lo) / (t_lo - t_hi)
+        width = hi - lo
+        if not lo + 0.05 * width < lam < hi - 0.05 * width:
+            lam = (lo + hi) / 2.0
+    return lam
+
+
+def size_portfolio(bets: list[list[Candidate]], multiplier: float, bankroll_cap: float, max_bet: float,
+                   exact_max_bets: int = 8) -> list[float]:
+    """
+    Simultaneous Kelly stakes (fractions of bankroll) for every bet sent in one
+    run; a bet is a single (one leg) or a parlay (its legs), paid at the product
+    of its legs' decimal odds.
+
+    Maximizes expected log growth jointly, so singles and parlays sharing legs,
+    and bets on the same outcome, are sized as one exposure rather than each
+    on its own. Up to `exact_max_bets` bets the growth is taken over the exact
+    outcome distribution; larger slates use a pairwise model (each bet's own
+    growth exact, interactions to second order from exact joint win
+    probabilities), so nothing is sampled and identical bets always get
+    identical stakes. The result is scaled by `multiplier` (fractional
+    Kelly), each bet is capped at `max_bet` and the run's total at
+    `bankroll_cap`; when the cap binds, the budget goes to the bets that add
+    the most growth, not pro rata. A bet with no legs or no payout (decimal
+    odds <= 1) gets 0.
+    """
+    decs = [parlay_decimal_odds([leg.target_odds for leg in legs]) if legs else 1.0 for legs in bets]
+    live = [b for b, d in enumerate(decs) if d > 1.0]
+    if len(live) < len(bets):
+        stakes = [0.0] * len(bets)
+        sized = size_portfolio([bets[b] for b in live], multiplier, bankroll_cap, max_bet, exact_max_bets)
+        for b, x in zip(live, sized):
+            stakes[b] = x
+        return stakes
+    if not bets:
+        return []
+
+    # solve for full Kelly with the caps scaled up, then shrink by the multiplier
+    upper = max_bet / multiplier
+    budget = bankroll_cap / multiplier
+
+    # pairwise model: the answer for large slates, the warm start otherwise
+    p_win, cross = pair_model(bets, decs)
+    lam_hi = max(max(d * p - 1.0 for d, p in zip(decs, p_win)), 0.0) + 1e-9
+    f = [0.0] * len(bets)
+    lam = _fit_budget(lambda x: _solve_pairs(decs, p_win, cross, upper, x, f), f, budget, lam_hi, 0.0)
+
+    if len(bets) <= exact_max_bets:
+        dist = outcome_distribution(bets)
+        states = list(dist)
+        probs = [dist[s] for s in states]
+        wins = [[s >> b & 1 for s in states] for b in range(len(bets))]
+        both = {(b, c): list(map(and_, wins[b], wins[c])) for b in range(len(bets)) for c in range(b + 1, len(bets))}
+        returns = [[(d - 1.0) if w else -1.0 for w in won] for d, won in zip(decs, wins)]
+
+        # the model can overshoot what every state's wealth allows
+        total = sum(f)
+        if total >= 1.0 - 1e-6:
+            f[:] = [x * (1.0 - 1e-3) / total for x in f]
+        wealth = [1.0] * len(states)
+        for fb, r in zip(f, returns):
+            wealth[:] = map(add, wealth, map(fb.__mul__, r))
+
+        lam = _fit_budget(lambda x: _solve_exact(decs, returns, wins, both, probs, upper, x, f, wealth),
+                          f, budget, lam_hi, lam)
+
+    total = sum(f)
+    if lam > 0.0 and total > 0.0:
+        # land exactly on the cap; the fit stops within 0.1% of it
+        f = [min(x * budget / total, upper) for x in f]
+
+    return [x * multiplier for x in f]
@@ -0,0 +1,129 @@
+from curves import curve_prob, fit_line_curve
+from probability import implied_prob_american, expected_value, consensus_probability_from_probs
+
+
+def _fair(e: dict) -> float:
+    if "fair_prob_in_book" in e:
+        return float(e["fair_prob_in_book"])
+    return implied_prob_american(int(e["price"]))
+
+
+def _curve_floor(curve, side: str, line: float, tol: float) -> tuple[float, int] | None:
+    """
+    Consensus for `side` at `line` off the other books' curve. Past the quoted
+    range monotonicity still gives a floor (Over below the lowest line is at
+    least as likely as there; Under above the highest likewise), which is
+    enough to flag a book whose line never followed the market.
+    """
+    point = curve_prob(curve, side, line, tol)
+    if point is not None:
+        return point
+    if side == "Over" and line < curve.lines[0]:
+        return curve.p_over[0], len(curve.books[0])
+    if side == "Under" and line > curve.lines[-1]:
+        return 1.0 - curve.p_over[-1], len(curve.books[-1])
+    return None
+
+
+def detect_stale_quotes(idx: dict, target_books: list[str], min_delta: float,
+                        min_lag_seconds: float, min_books: int, curve_tol: float | None = None) -> list[dict]:
+    """
+    Flag target-book quotes that lag a move the rest of the market already made.
+
+    One pass over the snapshot index. Each target book quote whose last_update
+    trails the freshest book on that outcome by at least `min_lag_seconds` is
+    compared against the *other* books: for Over/Under, with `curve_tol` set,
+    its line is priced off a line curve fitted without that book, so a book
+    still at 20.5 after everyone moved to 21.5 is measured against 21.5 (see
+    _curve_floor). Otherwise the weighted consensus of the other books at that
+    exact line is used. A quote is stale when its fair
+    prob sits at least `min_delta` below consensus (the price is too generous).
+
+    Each leave-one-book-out curve is fitted once per (market, participant,
+    book) and shared by the Over and Under quotes.
+
+    Returns dicts ranked by deviation, largest first.
+    """
+    targets = set(target_books)
+    out = []
+    loo_curves = {}   # (market, participant, book) -> curve without that book, or None
+
+    for (market, participant, side), entries in idx.items():
+        if not any(e["book"] in targets for e in entries):
+            continue
+        known = [e["ts"] for e in entries if e.get("ts") is not None]
+        if not known:
+            continue
+        newest = max(known)
+
+        by_line = {}
+        for e in entries:
+            line = e.get("line")
+            by_line.setdefault(None if line is None else float(line), []).append(e)
+
+        overs = None
+        if curve_tol is not None and side in ("Over", "Under"):
+            overs = idx.get((market, participant, "Over"), [])
+
+        for e in entries:
+            if e["book"] not in targets or e.get("ts") is None:
+                continue
+            lag = newest - e["ts"]
+            if lag < min_lag_seconds:
+                continue
+            line = None if e.get("line") is None else float(e["line"])
+
+            p_cons = None
+            books = 0
+            if overs is not None and line is not None:
+                key = (market, participant, e["book"])
+                if key not in loo_curves:
+                    loo_curves[key] = fit_line_curve([o for o in overs if o["book"] != e["book"]])
+                curve = loo_curves[key]
+                point = None if curve is None else _curve_floor(curve, side, line, curve_tol)
+                if point is not None:
+                    p_cons, books = point
+
+            if p_cons is None:
+                others = [o for o in by_line[line] if o is not e]
+                if others:
+                    p_cons = consensus_probability_from_probs(
+                        [_fair(o) for o in others], [o.get("w", 1.0) for o in others]
+                    )
+                    books = len(others)
+
+            if p_cons is None or books < min_books:
+                continue
+
+            p_book = _fair(e)
+            delta = p_cons - p_book
+            if delta < min_delta:
+                continue
+
+            odds = int(e["price"])
+            out.append({
+                "market": market,
+                "player": participant,
+                "side": side,
+                "line": line,
+                "book": e["book"],
+                "odds": odds,
+                "p_consensus": float(p_cons),
+                "delta": float(delta),
+                "lag_seconds": float(lag),
+                "books_count": books,
+                "ev": expected_value(p_cons, odds),
+            })
+
+    out.sort(key=lambda s: s["delta"], reverse=True)
+    return out
+
+
+def still_stale(fresh: list[dict], quote: dict) -> bool:
+    """True if a re-fetched detection still shows the same book at the same price."""
+    for s in fresh:
+        if (s["market"], s["player"], s["side"], s["line"], s["book"], s["odds"]) == (
+            quote["market"], quote["player"], quote["side"], quote["line"], quote["book"], quote["odds"]
+        ):
+            return True
+    return False
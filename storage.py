@@ -14,6 +14,7 @@ def init_db():
     """)
     conn.commit()
     conn.close()
+    init_outbox()
 
 def was_sent_recently(key, minutes):
     cutoff = int(time.time()) - minutes * 60
@@ -33,3 +34,67 @@ def mark_sent(key):
     )
     conn.commit()
     conn.close()
+
+# ---------- telegram outbox ----------
+
+def init_outbox():
+    conn = sqlite3.connect(DB_NAME)
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id TEXT PRIMARY KEY,
+            chat_id TEXT,
+            text TEXT,
+            ts INTEGER,
+            sent_ts INTEGER
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+def outbox_add(msg_id, chat_id, text):
+    """Returns False if this message id is already in the outbox."""
+    conn = sqlite3.connect(DB_NAME)
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT OR IGNORE INTO outbox (id, chat_id, text, ts, sent_ts) VALUES (?, ?, ?, ?, NULL)",
+        (msg_id, str(chat_id), text, int(time.time()))
+    )
+    added = cur.rowcount == 1
+    conn.commit()
+    conn.close()
+    return added
+
+def outbox_expire(max_age_minutes):
+    """Delete rows queued more than `max_age_minutes` ago, sent or not. Returns how many were never sent."""
+    cutoff = int(time.time()) - max_age_minutes * 60
+    conn = sqlite3.connect(DB_NAME)
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM outbox WHERE ts < ? AND sent_ts IS NULL", (cutoff,))
+    expired = cur.fetchone()[0]
+    cur.execute("DELETE FROM outbox WHERE ts < ?", (cutoff,))
+    conn.commit()
+    conn.close()
+    return expired
+
+def outbox_pending(max_age_minutes=None):
+    conn = sqlite3.connect(DB_NAME)
+    cur = conn.cursor()
+    if max_age_minutes is None:
+        cur.execute("SELECT id, chat_id, text FROM outbox WHERE sent_ts IS NULL ORDER BY ts, rowid")
+    else:
+        cutoff = int(time.time()) - max_age_minutes * 60
+        cur.execute(
+            "SELECT id, chat_id, text FROM outbox WHERE sent_ts IS NULL AND ts >= ? ORDER BY ts, rowid",
+            (cutoff,)
+        )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+def outbox_mark_sent(msg_id):
+    conn = sqlite3.connect(DB_NAME)
+    cur = conn.cursor()
+    cur.execute("UPDATE outbox SET sent_ts = ? WHERE id = ?", (int(time.time()), msg_id))
+    conn.commit()
+    conn.close()
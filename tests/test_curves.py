@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from curves import base_market, build_line_curves, curve_prob  # noqa: E402
+from scan import normalize_event_index  # noqa: E402
+
+
+def _ou(market: str, line: float, over: int, under: int) -> dict:
+    return {"key": market, "outcomes": [
+        {"name": "Over", "description": "Joe", "point": line, "price": over},
+        {"name": "Under", "description": "Joe", "point": line, "price": under},
+    ]}
+
+
+def test_base_market():
+    assert base_market("player_points_alternate") == "player_points"
+    assert base_market("player_points") == "player_points"
+
+
+def test_alternate_lines_feed_the_base_curve():
+    payload = {"bookmakers": [
+        {"key": book, "last_update": "2026-10-19T15:00:00Z", "markets": [
+            _ou("player_points", 20.5, -110, -110),
+            _ou("player_points_alternate", 24.5, 200, -250),
+        ]} for book in ("pinnacle", "draftkings")
+    ]}
+    idx = normalize_event_index(payload)
+    assert {k[0] for k in idx} == {"player_points"}
+
+    curve = build_line_curves(idx)[("player_points", "Joe")]
+    assert curve.lines == [20.5, 24.5]
+    p, books = curve_prob(curve, "Over", 22.5, 1.0)
+    assert curve.p_over[1] < p < curve.p_over[0]
+    assert books == 2
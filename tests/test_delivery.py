@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from delivery import DeliveryQueue, split_message  # noqa: E402
+
+
+def test_short_message_is_one_chunk():
+    assert split_message("a\n\nb", limit=10) == ["a\n\nb"]
+
+
+def test_split_prefers_sections_and_keeps_separators():
+    sections = ["\n".join(f"s{i} line {j}" for j in range(3)) for i in range(4)]
+    text = "\n\n".join(sections)
+    chunks = split_message(text, limit=len(sections[0]) * 2 + 2)
+    assert all(len(c) <= len(sections[0]) * 2 + 2 for c in chunks)
+    assert chunks == ["\n\n".join(sections[:2]), "\n\n".join(sections[2:])]
+
+
+def test_oversized_section_splits_on_lines_without_double_spacing():
+    lines = [f"line {j:02d}" for j in range(20)]
+    text = "head\n\n" + "\n".join(lines) + "\n\ntail"
+    assert split_message(text, limit=40) == [
+        "head\n\n" + "\n".join(lines[:4]),
+        "\n".join(lines[4:9]),
+        "\n".join(lines[9:14]),
+        "\n".join(lines[14:19]),
+        lines[19] + "\n\ntail",
+    ]
+
+
+def test_long_line_is_hard_cut():
+    chunks = split_message("x" * 25, limit=10)
+    assert chunks == ["x" * 10, "x" * 10, "x" * 5]
+
+
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DB_NAME", str(tmp_path / "bot.db"))
+    storage.init_db()
+    return storage.DB_NAME
+
+
+def _age(db: str, msg_id: str, minutes: int) -> None:
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE outbox SET ts = ? WHERE id = ?", (int(time.time()) - minutes * 60, msg_id))
+    conn.commit()
+    conn.close()
+
+
+def test_outbox_skips_and_expires_old_rows(outbox):
+    for msg_id in ("old", "fresh", "old_sent"):
+        storage.outbox_add(msg_id, "c1", msg_id)
+    _age(outbox, "old", 120)
+    _age(outbox, "old_sent", 120)
+    storage.outbox_mark_sent("old_sent")
+
+    assert [r[0] for r in storage.outbox_pending(30)] == ["fresh"]
+    assert [r[0] for r in storage.outbox_pending()] == ["old", "fresh"]
+
+    assert storage.outbox_expire(30) == 1
+    assert [r[0] for r in storage.outbox_pending()] == ["fresh"]
+    conn = sqlite3.connect(outbox)
+    assert conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0] == 1
+    conn.close()
+
+
+def test_delivery_start_requeues_only_fresh_rows(outbox):
+    storage.outbox_add("old", "c1", "stale alert")
+    storage.outbox_add("fresh", "c1", "picks")
+    _age(outbox, "old", 120)
+
+    sent = []
+    q = DeliveryQueue("token", ["c1"], 20, 25, max_age_minutes=30)
+    q._post = lambda chat_id, text: (sent.append(text), ("ok", None))[1]
+    q.start()
+    assert q.flush(5.0)
+    q.close()
+    assert sent == ["picks"]
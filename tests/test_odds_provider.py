@@ -0,0 +1,36 @@
+import dataclasses
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import odds_provider  # noqa: E402
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+    url = "https://example.invalid"
+    content = b'{"id": "ev1", "bookmakers": []}'
+    text = content.decode()
+
+    def raise_for_status(self):
+        pass
+
+
+def test_every_region_request_is_counted(monkeypatch):
+    sent = []
+    fake = types.SimpleNamespace(get=lambda url, params, timeout: (sent.append(params["regions"]), _Response())[1])
+    monkeypatch.setitem(sys.modules, "requests", fake)
+    monkeypatch.setattr(odds_provider, "CONFIG", dataclasses.replace(
+        odds_provider.CONFIG, ODDS_API_KEY="key", REGIONS=("us", "us2", "eu"), RATE_LIMIT_DB="",
+    ))
+
+    before = odds_provider.api_calls()
+    odds_provider.get_event_odds_multi_book("basketball_nba", "ev1", "h2h")
+    after = odds_provider.api_calls()
+
+    assert sorted(sent) == ["eu", "us", "us2"]
+    assert after["event-odds"] - before["event-odds"] == 3
+    assert after["events"] == before["events"]
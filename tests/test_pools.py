@@ -0,0 +1,43 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Candidate  # noqa: E402
+from pools import TopKPool  # noqa: E402
+
+
+def _cand(i: int, event: int) -> Candidate:
+    return Candidate("basketball_nba", f"ev{event}", f"E{event}", "player_points", f"P{i}",
+                     "Over", 20.5, 0.55, 5, "draftkings", -110, 0.05)
+
+
+def _stable_top(scored: list[tuple[Candidate, float]], n: int, one_per_event: bool) -> list[Candidate]:
+    # the sort-then-scan selection the pool replaces
+    out = []
+    seen = set()
+    for c, _ in sorted(scored, key=lambda t: t[1], reverse=True):
+        if one_per_event and c.event in seen:
+            continue
+        seen.add(c.event)
+        out.append(c)
+        if len(out) >= n:
+            break
+    return out
+
+
+@pytest.mark.parametrize("seed", range(200))
+@pytest.mark.parametrize("one_per_event", [False, True])
+def test_pool_matches_stable_sort_including_ties(seed, one_per_event):
+    rng = random.Random(seed)
+    # few distinct scores, so ties at the cut and within an event are common
+    scored = [(_cand(i, rng.randrange(6)), float(rng.randrange(5))) for i in range(rng.randint(1, 30))]
+    k = rng.randint(1, 8)
+
+    pool = TopKPool(k, one_per_event)
+    for c, score in scored:
+        pool.push(c, score)
+    assert pool.ranked() == _stable_top(scored, k, one_per_event)
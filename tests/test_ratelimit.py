@@ -0,0 +1,22 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import SharedRateLimiter  # noqa: E402
+
+
+def test_record_prunes_old_ledger_rows(tmp_path):
+    limiter = SharedRateLimiter(str(tmp_path / "rl.db"), "key", 5.0, 10, 2, 0, ledger_days=7)
+    conn = limiter._conn()
+    old = time.time() - 8 * 86400
+    conn.execute(
+        "INSERT INTO ledger (ts, key, instance, priority, status, cost, remaining) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (old, limiter.key, "1", "scan", 200, 1, 100),
+    )
+
+    limiter.record("scan", 200, {"x-requests-remaining": "99", "x-requests-last": "1"})
+
+    rows = conn.execute("SELECT ts FROM ledger").fetchall()
+    assert len(rows) == 1 and rows[0][0] > old
@@ -0,0 +1,79 @@
+import itertools
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from curves import base_market  # noqa: E402
+from models import Candidate  # noqa: E402
+from probability import expected_value, parlay_decimal_odds, parlay_ev  # noqa: E402
+from scorer import build_controlled_sgp, build_top_sgps  # noqa: E402
+
+MARKETS = ["player_points", "player_points_alternate", "player_threes", "player_assists"]
+
+
+def _slate(seed: int) -> list[Candidate]:
+    rng = random.Random(seed)
+    out = []
+    for e in range(3):
+        for _ in range(rng.randint(4, 12)):
+            p = rng.uniform(0.3, 0.7)
+            odds = rng.choice([-150, -120, -110, 100, 110, 130, 160, 200, 250])
+            out.append(Candidate(
+                "basketball_nba", f"ev{e}", f"A{e} @ H{e}", rng.choice(MARKETS), f"P{rng.randint(0, 5)}",
+                rng.choice(["Over", "Under"]), rng.choice([10.5, 20.5, 24.5]), p, 5, "draftkings", odds,
+                expected_value(p, odds),
+            ))
+    return out
+
+
+def _valid(legs) -> bool:
+    return (len({c.player for c in legs}) == len(legs)
+            and len({base_market(c.market) for c in legs}) == len(legs))
+
+
+def _ev(legs) -> float:
+    return parlay_ev([c.p_model for c in legs], [c.target_odds for c in legs])
+
+
+def _brute(approved, n_legs, cap, k):
+    evs = []
+    for event in {c.event for c in approved}:
+        legs = [c for c in approved if c.event == event]
+        for combo in itertools.combinations(legs, n_legs):
+            if _valid(combo) and parlay_decimal_odds([c.target_odds for c in combo]) <= cap:
+                evs.append(_ev(combo))
+    return sorted(evs, reverse=True)[:k]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("n_legs, cap", [(2, 6.0), (3, 15.0)])
+def test_top_sgps_match_brute_force(seed, n_legs, cap):
+    approved = _slate(seed)
+    got = build_top_sgps(approved, cap, 5, n_legs)
+    assert all(_valid(pkg["legs"]) and pkg["dec_odds"] <= cap for pkg in got)
+    assert [pkg["ev"] for pkg in got] == pytest.approx(_brute(approved, n_legs, cap, 5))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_controlled_sgp_matches_brute_force(seed):
+    approved = _slate(seed)
+    anchors = random.Random(seed).sample(approved, 3)
+    cap = 6.0
+
+    best = None
+    for a in anchors:
+        for c in approved:
+            pair = (a, c)
+            if c.event == a.event and _valid(pair) and parlay_decimal_odds([a.target_odds, c.target_odds]) <= cap:
+                best = max(best or -1e9, _ev(pair))
+
+    got = build_controlled_sgp(approved, anchors, cap)
+    if best is None:
+        assert got is None
+    else:
+        assert got["legs"][0] in anchors and _valid(got["legs"])
+        assert got["ev"] == pytest.approx(best)
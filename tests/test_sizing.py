@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Candidate  # noqa: E402
+from probability import expected_value  # noqa: E402
+from sizing import size_portfolio  # noqa: E402
+
+CAPS = (0.25, 0.03, 0.01)  # KELLY_MULTIPLIER, KELLY_BANKROLL_CAP, KELLY_MAX_BET defaults
+
+
+def _single(i: int, p: float = 0.6, odds: int = 120) -> Candidate:
+    return Candidate("basketball_nba", f"ev{i}", f"A{i} @ H{i}", "player_points", f"Player {i}",
+                     "Over", 20.5, p, 5, "draftkings", odds, expected_value(p, odds))
+
+
+@pytest.mark.parametrize("n, exact_max_bets", [(6, 8), (13, 8), (13, 0), (30, 8)])
+def test_identical_bets_get_identical_stakes(n, exact_max_bets):
+    stakes = size_portfolio([[_single(i)] for i in range(n)], *CAPS, exact_max_bets)
+    assert max(stakes) - min(stakes) < 1e-9
+    # the cap binds, so the budget is split evenly
+    assert sum(stakes) == pytest.approx(0.03)
+
+
+def test_model_tracks_exact_solution():
+    legs = [_single(i, p, odds) for i, (p, odds) in
+            enumerate([(0.55, -110), (0.52, 105), (0.6, -120), (0.48, 140), (0.58, 120), (0.5, 110)])]
+    bets = [[c] for c in legs[:4]] + [[legs[0], legs[1], legs[4]], [legs[2], legs[5]]]
+    exact = size_portfolio(bets, *CAPS, exact_max_bets=len(bets))
+    model = size_portfolio(bets, *CAPS, exact_max_bets=0)
+    assert max(abs(a - b) for a, b in zip(exact, model)) < 0.0005
+
+
+def test_default_exact_path_is_fast():
+    bets = [[_single(i)] for i in range(8)]
+    start = time.perf_counter()
+    size_portfolio(bets, *CAPS)
+    assert time.perf_counter() - start < 0.25
+
+
+def test_bet_without_legs_gets_nothing():
+    # a parlay whose legs all failed verification
+    stakes = size_portfolio([[_single(0)], [], [_single(1)]], *CAPS)
+    assert stakes[1] == 0.0
+    assert stakes[0] == pytest.approx(stakes[2]) and stakes[0] > 0.0
+    assert size_portfolio([[]], *CAPS) == [0.0]
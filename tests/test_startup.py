@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# cumulative `import bot` time, microseconds; generous enough for a loaded CI box
+BUDGET_US = int(os.environ.get("IMPORT_BUDGET_US", "150000"))
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Run `python -X importtime -c "import <module>"` and return {module: cumulative µs}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for row in proc.stderr.splitlines():
+        if not row.startswith("import time:") or "|" not in row:
+            continue
+        _, cumulative, name = row.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # header row
+    return times
+
+
+def test_bot_import_stays_under_budget():
+    # best of three: the first run also pays for writing .pyc files
+    best = min(_import_times("bot")["bot"] for _ in range(3))
+    assert best < BUDGET_US, f"import bot took {best}µs (budget {BUDGET_US}µs)"
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    loaded = _import_times("bot")
+    for heavy in ("requests", "dateutil", "http.server", "board"):
+        assert heavy not in loaded, f"{heavy} is imported at startup"
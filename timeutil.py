@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta, time as dtime
+from zoneinfo import ZoneInfo
+
+# resolved once at import; every ET computation reuses it
+EASTERN = ZoneInfo("America/New_York")
+
+
+def parse_iso_utc(ts: str) -> datetime:
+    """
+    Parse the API's ISO-8601 timestamps ("2024-10-19T23:10:00Z") to an aware UTC datetime.
+    Standard-library fast path; naive values are taken as UTC.
+    """
+    if ts.endswith("Z"):
+        ts = ts[:-1] + "+00:00"
+    dt = datetime.fromisoformat(ts)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def parse_iso_epoch(ts: str) -> float:
+    return parse_iso_utc(ts).timestamp()
+
+
+@dataclass(frozen=True)
+class EventWindow:
+    """Today's ET day and the pregame cutoff, as UTC epoch seconds."""
+    day_start: float
+    day_end: float
+    pregame_cutoff: float
+
+    def accepts(self, commence_epoch: float) -> bool:
+        return self.day_start <= commence_epoch < self.day_end and commence_epoch >= self.pregame_cutoff
+
+
+def event_window(pregame_buffer_minutes: int, now: datetime | None = None) -> EventWindow:
+    """Compute the run's event window once; filtering is then plain float comparisons."""
+    now_et = (now or datetime.now(timezone.utc)).astimezone(EASTERN)
+    today = now_et.date()
+    start = datetime.combine(today, dtime(), tzinfo=EASTERN)
+    end = datetime.combine(today + timedelta(days=1), dtime(), tzinfo=EASTERN)
+    return EventWindow(
+        day_start=start.timestamp(),
+        day_end=end.timestamp(),
+        pregame_cutoff=now_et.timestamp() + pregame_buffer_minutes * 60,
+    )
+
+
+def filter_events(events: list[dict], window: EventWindow) -> list[dict]:
+    """Keep events commencing later today (ET) and past the pregame buffer; parses each time once."""
+    out = []
+    for e in events:
+        ct = e.get("commence_time")
+        if not ct:
+            continue
+        try:
+            ts = parse_iso_epoch(ct)
+        except ValueError:
+            continue
+        if window.accepts(ts):
+            out.append(e)
+    return out